@@ -1,48 +1,123 @@
 # IBM Quantum Experience Integration
-# Note: This requires IBM Quantum account and API token
+# Note: Real hardware requires an IBM Quantum account and API token.
+# Without one, jobs run on a local noisy simulator with the same interface.
+import asyncio
+import time
 
-"""
-# Uncomment and configure with your IBM Quantum API token
+from qiskit import QuantumCircuit, transpile
+from qiskit.providers import JobStatus
+from qiskit_aer import AerSimulator
 
-from qiskit_ibm_runtime import QiskitRuntimeService
+def local_noisy_backend():
+    """Aer simulator carrying the noise model and coupling map of a fake IBM device"""
+    from qiskit.providers.fake_provider import FakeManilaV2
+    return AerSimulator.from_backend(FakeManilaV2())
 
-# Save your API token (one-time setup)
-# QiskitRuntimeService.save_account(channel="ibm_quantum", token="YOUR_API_TOKEN")
+def ibm_backend(channel="ibm_quantum"):
+    """Least busy real IBM backend (needs a saved account)"""
+    from qiskit_ibm_runtime import QiskitRuntimeService
+    
+    # Save your API token (one-time setup)
+    # QiskitRuntimeService.save_account(channel="ibm_quantum", token="YOUR_API_TOKEN")
+    service = QiskitRuntimeService(channel=channel)
+    backend = service.least_busy(operational=True, simulator=False)
+    print(f"Using backend: {backend.name}")
+    return backend
+
+class JobFailedError(RuntimeError):
+    pass
 
-def run_on_real_quantum_computer():
-    # Load your account
-    service = QiskitRuntimeService(channel="ibm_quantum")
+class AsyncJobRunner:
+    def __init__(self, backend=None, shots=1000, batch_size=20, max_in_flight=4,
+                 max_retries=3, poll_interval=0.5, retry_backoff=1.0):
+        # Any backend with run()/status()/result() works; default is offline
+        self.backend = backend if backend is not None else local_noisy_backend()
+        self.shots = shots
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        
+        self.jobs_submitted = 0
+        self.retries = 0
     
-    # Get available backends
-    backends = service.backends()
-    print("Available backends:", [b.name for b in backends])
+    async def _run_batch(self, circuits, semaphore):
+        """Submit one batched job and poll it, retrying failed attempts"""
+        loop = asyncio.get_running_loop()
+        compiled = await loop.run_in_executor(None, transpile, circuits, self.backend)
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with semaphore:
+                    job = await loop.run_in_executor(
+                        None, lambda: self.backend.run(compiled, shots=self.shots))
+                    self.jobs_submitted += 1
+                    
+                    status = await loop.run_in_executor(None, job.status)
+                    while status not in (JobStatus.DONE, JobStatus.ERROR, JobStatus.CANCELLED):
+                        await asyncio.sleep(self.poll_interval)
+                        status = await loop.run_in_executor(None, job.status)
+                    if status != JobStatus.DONE:
+                        raise JobFailedError(f"Job {job.job_id()} finished with status {status.name}")
+                    
+                    result = await loop.run_in_executor(None, job.result)
+                return [result.get_counts(i) for i in range(len(compiled))]
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
     
-    # Get the least busy backend
-    from qiskit_ibm_runtime import least_busy
-    backend = least_busy(backends)
-    print(f"Using backend: {backend.name}")
+    async def run(self, circuits):
+        """Run all circuits, batch_size per job with at most max_in_flight jobs at once
+        
+        Returns the counts for each circuit, in input order.
+        """
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        batches = [circuits[start:start + self.batch_size]
+                   for start in range(0, len(circuits), self.batch_size)]
+        batch_counts = await asyncio.gather(*(self._run_batch(batch, semaphore)
+                                              for batch in batches))
+        return [counts for batch in batch_counts for counts in batch]
     
+    def run_sync(self, circuits):
+        """Blocking wrapper around run() for scripts"""
+        return asyncio.run(self.run(circuits))
+
+def bell_circuit():
     # Create a simple circuit
     qc = QuantumCircuit(2)
     qc.h(0)
     qc.cx(0, 1)
     qc.measure_all()
+    return qc
+
+def run_on_real_quantum_computer(backend=None):
+    """Run a Bell circuit on real hardware (or any backend passed in)"""
+    runner = AsyncJobRunner(backend if backend is not None else ibm_backend())
     
     # Run on real quantum computer
-    job = backend.run(qc, shots=1000)
-    result = job.result()
-    counts = result.get_counts()
+    counts = runner.run_sync([bell_circuit()])[0]
     
     print("Results from real quantum computer:", counts)
     return counts
 
-# Run if you have IBM Quantum access
-# real_results = run_on_real_quantum_computer()
-"""
-
-print("IBM Quantum Experience integration code template.")
-print("To use this, you need to:")
-print("1. Create an account at https://quantum-computing.ibm.com/")
-print("2. Get your API token")
-print("3. Uncomment and configure the code above")
-print("4. Install: pip install qiskit-ibm-runtime")
+if __name__ == "__main__":
+    # Load-test the pipeline offline on the local noisy backend
+    runner = AsyncJobRunner(batch_size=25, max_in_flight=4, poll_interval=0.05)
+    circuits = [bell_circuit() for _ in range(200)]
+    
+    start_time = time.perf_counter()
+    all_counts = runner.run_sync(circuits)
+    elapsed = time.perf_counter() - start_time
+    
+    print(f"Ran {len(all_counts)} circuits in {runner.jobs_submitted} jobs "
+          f"({runner.retries} retries) in {elapsed:.2f} s")
+    print("First result (noisy):", all_counts[0])
+    
+    print("\nTo run on real hardware you need to:")
+    print("1. Create an account at https://quantum-computing.ibm.com/")
+    print("2. Get your API token and save it with QiskitRuntimeService.save_account")
+    print("3. Install: pip install qiskit-ibm-runtime")
+    print("4. Call run_on_real_quantum_computer()")
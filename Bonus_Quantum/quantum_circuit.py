@@ -1,13 +1,45 @@
 # Quantum AI Simulation for Drug Discovery Optimization
+import itertools
+
 import numpy as np
-from qiskit import QuantumCircuit, transpile
-from qiskit.visualization import plot_histogram
+from qiskit import QuantumCircuit
+from qiskit.circuit import ParameterVector
 from qiskit_aer import AerSimulator
-import matplotlib.pyplot as plt
+
+from transpile_cache import TranspileCache
+
+# Gates the Aer stabilizer method simulates in polynomial time
+CLIFFORD_GATES = {'h', 'x', 'y', 'z', 's', 'sdg', 'sx', 'sxdg', 'cx', 'cy', 'cz', 'swap',
+                  'id', 'delay', 'barrier', 'measure', 'reset'}
 
 class QuantumAIDemo:
-    def __init__(self):
-        self.simulator = AerSimulator()
+    def __init__(self, transpile_cache=None, precision='double', max_parallel_threads=0,
+                 max_statevector_qubits=24, show_plots=True, plot_dpi=300, plot_format=None):
+        # precision='single' halves statevector memory; 0 threads means all cores
+        self.precision = precision
+        self.max_parallel_threads = max_parallel_threads
+        self.simulator = AerSimulator(precision=precision,
+                                      max_parallel_threads=max_parallel_threads)
+        
+        # method -> AerSimulator; each reports its own qubit limit to the transpiler
+        self._simulators = {}
+        
+        # Beyond this many qubits non-Clifford circuits use matrix_product_state
+        self.max_statevector_qubits = max_statevector_qubits
+        self.last_method = None
+        
+        # show_plots=False saves result plots headless for batch jobs
+        self.show_plots = show_plots
+        self.plot_dpi = plot_dpi
+        self.plot_format = plot_format
+        self._histogram_figure = None  # Agg figure reused across headless plots
+        
+        # Compiled circuits keyed by structure, backend and optimization level;
+        # pass TranspileCache(cache_dir=...) to persist them across runs
+        self.transpile_cache = transpile_cache if transpile_cache is not None else TranspileCache()
+        
+        # n_qubits -> transpiled parameterized optimization circuit
+        self._parameterized_circuits = {}
     
     def create_bell_state(self):
         """Create a Bell state circuit - fundamental quantum entanglement"""
@@ -35,14 +67,144 @@ class QuantumAIDemo:
         qc.measure_all()
         return qc
     
-    def run_simulation(self, circuit, shots=1000):
-        """Run quantum circuit simulation"""
-        compiled_circuit = transpile(circuit, self.simulator)
-        job = self.simulator.run(compiled_circuit, shots=shots)
+    def create_parameterized_optimization(self, n_qubits=3):
+        """Optimization circuit with one rz angle Parameter per coupling"""
+        thetas = ParameterVector('theta', n_qubits - 1)
+        qc = QuantumCircuit(n_qubits)
+        
+        for qubit in range(n_qubits):
+            qc.h(qubit)
+        
+        for i in range(n_qubits-1):
+            qc.cx(i, i+1)
+            qc.rz(thetas[i], i+1)
+            qc.cx(i, i+1)
+        
+        qc.measure_all()
+        return qc
+    
+    def compiled_parameterized_optimization(self, n_qubits=3):
+        """Transpile the parameterized circuit once per size and reuse it"""
+        compiled = self._parameterized_circuits.get(n_qubits)
+        if compiled is None:
+            compiled = self.transpile_cache.transpile(
+                self.create_parameterized_optimization(n_qubits), self.simulator)
+            self._parameterized_circuits[n_qubits] = compiled
+        return compiled
+    
+    def run_sweep(self, param_grid, shots=1000, n_qubits=3, max_parallel_experiments=0):
+        """Run the optimization circuit for many angle bindings in one batched job
+        
+        `param_grid` is either a sequence of per-parameter value lists, whose
+        cartesian product is swept, or a 2-D array with one row of angles per
+        experiment. Returns the (n_points, n_qubits - 1) angle array and the
+        counts for each row. max_parallel_experiments=0 lets Aer run
+        experiments on all cores.
+        """
+        compiled = self.compiled_parameterized_optimization(n_qubits)
+        thetas = sorted(compiled.parameters, key=lambda p: p.index)
+        
+        if isinstance(param_grid, np.ndarray) and param_grid.ndim == 2:
+            points = param_grid
+        else:
+            points = np.array(list(itertools.product(*param_grid)), dtype=float)
+        if points.shape[1] != len(thetas):
+            raise ValueError(f"Expected {len(thetas)} angles per point, got {points.shape[1]}")
+        
+        # One circuit, every binding: Aer expands them into parallel experiments
+        binds = {theta: points[:, i].tolist() for i, theta in enumerate(thetas)}
+        job = self.simulator.run(compiled, shots=shots, parameter_binds=[binds],
+                                 max_parallel_experiments=max_parallel_experiments)
+        result = job.result()
+        counts = [result.get_counts(i) for i in range(len(points))]
+        return points, counts
+    
+    def simulator_for(self, method):
+        """AerSimulator fixed to one method, created once and reused"""
+        simulator = self._simulators.get(method)
+        if simulator is None:
+            simulator = AerSimulator(method=method, precision=self.precision,
+                                     max_parallel_threads=self.max_parallel_threads)
+            self._simulators[method] = simulator
+        return simulator
+    
+    def select_method(self, circuit):
+        """Pick the cheapest exact Aer method for a circuit's size and gate set
+        
+        Clifford-only circuits (like the Bell state) use the stabilizer method at
+        any size. Others use a dense statevector up to max_statevector_qubits,
+        then matrix_product_state, whose cost grows with entanglement instead of
+        2**n_qubits. The linear-chain optimization circuit has little of that.
+        """
+        # save_* instructions only record results and work with every method
+        gates = {instruction.operation.name for instruction in circuit.data
+                 if not instruction.operation.name.startswith('save_')}
+        if gates <= CLIFFORD_GATES:
+            return 'stabilizer'
+        if circuit.num_qubits <= self.max_statevector_qubits:
+            return 'statevector'
+        return 'matrix_product_state'
+    
+    def run_simulation(self, circuit, shots=1000, optimization_level=None, method=None):
+        """Run quantum circuit simulation
+        
+        `method` overrides the automatic choice from select_method().
+        """
+        # Choose the method first: the default simulator only accepts circuits
+        # up to the statevector size that fits in memory
+        self.last_method = method or self.select_method(circuit)
+        simulator = self.simulator_for(self.last_method)
+        compiled_circuit = self.transpile_cache.transpile(circuit, simulator, optimization_level)
+        job = simulator.run(compiled_circuit, shots=shots)
         result = job.result()
         counts = result.get_counts()
         return counts
     
+    def run_exact(self, circuit, qubits=None, method=None):
+        """Exact outcome probabilities from one simulation pass, without sampling
+        
+        Final measurements are dropped and the probabilities saved instead.
+        Pass `qubits` to get the marginal over a subset; the full distribution
+        over many qubits has 2**n entries.
+        """
+        exact_circuit = circuit.remove_final_measurements(inplace=False)
+        qubits = list(range(exact_circuit.num_qubits)) if qubits is None else list(qubits)
+        exact_circuit.save_probabilities_dict(qubits)
+        
+        self.last_method = method or self.select_method(exact_circuit)
+        simulator = self.simulator_for(self.last_method)
+        compiled_circuit = self.transpile_cache.transpile(exact_circuit, simulator)
+        result = simulator.run(compiled_circuit, shots=1).result()
+        
+        # Keys come back as integers or hex strings; report bitstrings like get_counts
+        probabilities = result.data(0)['probabilities']
+        return {format(int(key, 16) if isinstance(key, str) else key, f'0{len(qubits)}b'): float(p)
+                for key, p in probabilities.items()}
+    
+    def _save_histogram(self, counts, title, output_path):
+        """Plot measurement counts; with show_plots=False nothing blocks or needs a display"""
+        # Imported only when a demo actually plots
+        from qiskit.visualization import plot_histogram
+        if self.show_plots:
+            import matplotlib.pyplot as plt
+            fig = plt.figure(figsize=(7, 5))
+        else:
+            # Agg canvas on a plain Figure: pyplot and the global backend are left alone
+            if self._histogram_figure is None:
+                from matplotlib.backends.backend_agg import FigureCanvasAgg
+                from matplotlib.figure import Figure
+                self._histogram_figure = Figure(figsize=(7, 5))
+                FigureCanvasAgg(self._histogram_figure)
+            fig = self._histogram_figure
+            fig.clf()
+        
+        plot_histogram(counts, title=title, ax=fig.add_subplot(1, 1, 1))
+        fig.savefig(output_path, dpi=self.plot_dpi, format=self.plot_format, bbox_inches='tight')
+        if self.show_plots:
+            plt.show()
+            plt.close(fig)
+        return output_path
+    
     def demonstrate_entanglement(self):
         """Demonstrate quantum entanglement with Bell state"""
         print("=== Quantum Entanglement Demo ===")
@@ -53,11 +215,11 @@ class QuantumAIDemo:
         counts = self.run_simulation(bell_circuit)
         print("\nMeasurement Results:")
         print(counts)
+        probabilities = self.run_exact(bell_circuit)
+        print(f"Exact probabilities ({self.last_method}):", probabilities)
         
         # Plot results
-        plot_histogram(counts, title="Bell State Measurement Results")
-        plt.savefig('bell_state_results.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        self._save_histogram(counts, "Bell State Measurement Results", 'bell_state_results.png')
         
         return bell_circuit, counts
     
@@ -73,9 +235,7 @@ class QuantumAIDemo:
         print(counts)
         
         # Plot results
-        plot_histogram(counts, title="Quantum Optimization Results")
-        plt.savefig('optimization_results.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        self._save_histogram(counts, "Quantum Optimization Results", 'optimization_results.png')
         
         return opt_circuit, counts
     
@@ -115,6 +275,16 @@ if __name__ == "__main__":
     bell_circuit, bell_results = quantum_demo.demonstrate_entanglement()
     opt_circuit, opt_results = quantum_demo.demonstrate_optimization()
     
+    # Sweep the energy landscape over a grid of coupling angles
+    angles = np.linspace(0, np.pi, 16)
+    points, sweep_counts = quantum_demo.run_sweep([angles, angles], shots=1000)
+    print(f"\nSwept {len(points)} angle combinations in one batched job")
+    print("Transpile cache:", quantum_demo.transpile_cache.stats())
+    
+    # Large linear-chain circuits switch to the matrix product state method
+    large_counts = quantum_demo.run_simulation(quantum_demo.create_quantum_optimization(32), shots=100)
+    print(f"32-qubit optimization circuit simulated with {quantum_demo.last_method}")
+    
     # Explain applications
     quantum_demo.explain_drug_discovery_application()
     
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+
+from qiskit import QuantumCircuit
+from qiskit_aer import AerSimulator
+
+from transpile_cache import TranspileCache
+
+MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+KEY_SCRIPT = """
+from qiskit import QuantumCircuit
+from qiskit_aer import AerSimulator
+from transpile_cache import TranspileCache
+
+circuit = QuantumCircuit(2, 2)
+circuit.h(0)
+circuit.cx(0, 1)
+circuit.measure([0, 1], [0, 1])
+print(TranspileCache().key(circuit, AerSimulator(), optimization_level=1))
+"""
+
+def bell_circuit():
+    circuit = QuantumCircuit(2, 2)
+    circuit.h(0)
+    circuit.cx(0, 1)
+    circuit.measure([0, 1], [0, 1])
+    return circuit
+
+def _key_in_subprocess():
+    result = subprocess.run([sys.executable, '-c', KEY_SCRIPT], cwd=MODULE_DIR,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+def test_key_is_stable_across_processes():
+    first = _key_in_subprocess()
+    second = _key_in_subprocess()
+    assert first and first == second
+    assert TranspileCache().key(bell_circuit(), AerSimulator(), optimization_level=1) == first
+
+def test_key_depends_on_circuit_and_level():
+    cache = TranspileCache()
+    backend = AerSimulator()
+    key = cache.key(bell_circuit(), backend, optimization_level=1)
+    assert cache.key(bell_circuit(), backend, optimization_level=2) != key
+    
+    other = bell_circuit()
+    other.x(1)
+    assert cache.key(other, backend, optimization_level=1) != key
+
+def test_hit_miss_and_disk_hit_counts(tmp_path):
+    backend = AerSimulator()
+    cache = TranspileCache(cache_dir=tmp_path)
+    
+    compiled = cache.transpile(bell_circuit(), backend, optimization_level=1)
+    assert (cache.hits, cache.misses, cache.disk_hits) == (0, 1, 0)
+    assert cache.transpile(bell_circuit(), backend, optimization_level=1) is compiled
+    assert (cache.hits, cache.misses, cache.disk_hits) == (1, 1, 0)
+    
+    # A fresh cache on the same directory loads the QPY file instead of transpiling
+    reloaded = TranspileCache(cache_dir=tmp_path)
+    from_disk = reloaded.transpile(bell_circuit(), backend, optimization_level=1)
+    assert (reloaded.hits, reloaded.misses, reloaded.disk_hits) == (1, 0, 1)
+    assert from_disk == compiled
+
+def test_key_depends_on_simulation_method():
+    cache = TranspileCache()
+    circuit = bell_circuit()
+    keys = {cache.key(circuit, AerSimulator(method=method), optimization_level=1)
+            for method in ('statevector', 'stabilizer', 'matrix_product_state')}
+    assert len(keys) == 3
@@ -0,0 +1,153 @@
+# Cache of transpiled circuits for repeated simulations
+import collections
+import hashlib
+import os
+import threading
+
+from qiskit import qpy, transpile
+
+def _update_circuit(digest, circuit, standard_gates):
+    digest.update(f"{circuit.num_qubits}:{circuit.num_clbits}:{circuit.global_phase}".encode())
+    for register in circuit.qregs + circuit.cregs:
+        digest.update(f"|{register.name}:{register.size}".encode())
+    for instruction in circuit.data:
+        operation = instruction.operation
+        qubits = [circuit.find_bit(qubit).index for qubit in instruction.qubits]
+        clbits = [circuit.find_bit(clbit).index for clbit in instruction.clbits]
+        digest.update(f"|{operation.name}{qubits}{clbits}".encode())
+        
+        for param in operation.params:
+            if hasattr(param, 'data') and hasattr(param, 'qregs'):
+                _update_circuit(digest, param, standard_gates)  # control-flow body
+            elif hasattr(param, 'tobytes'):
+                digest.update(param.tobytes())  # e.g. a unitary matrix
+            else:
+                digest.update(f"({param})".encode())
+        
+        # c_if conditions: a classical register or bit and the value compared against
+        condition = getattr(operation, 'condition', None)
+        if condition is not None and not isinstance(condition, tuple):
+            digest.update(f"?{condition!r}".encode())  # classical expression
+        elif condition is not None:
+            target, value = condition
+            where = (f"{target.name}:{target.size}" if hasattr(target, 'size')
+                     else circuit.find_bit(target).index)
+            digest.update(f"?{where}=={value}".encode())
+        
+        # Custom and composite gates are only identified by name, so hash what they contain
+        definition = getattr(operation, 'definition', None)
+        if operation.name not in standard_gates and definition is not None:
+            digest.update(b"{")
+            _update_circuit(digest, definition, standard_gates)
+            digest.update(b"}")
+
+def circuit_hash(circuit):
+    """Hash of a circuit's structure: registers, global phase, gates (with the
+    definitions of non-standard gates), parameters, conditions and wiring"""
+    from qiskit.circuit.library import get_standard_gate_name_mapping
+    
+    digest = hashlib.sha256()
+    _update_circuit(digest, circuit, set(get_standard_gate_name_mapping()))
+    return digest.hexdigest()
+
+def backend_fingerprint(backend):
+    """Identify a backend by what affects compilation: name, version, method, gates and coupling
+    
+    Run options such as shots, precision or thread counts are left out, and
+    so is any repr, so the key is stable across processes for the disk tier.
+    """
+    # BackendV1 (e.g. AerSimulator in qiskit-aer 0.12) exposes name() as a method
+    name = backend.name() if callable(backend.name) else backend.name
+    parts = [name, str(getattr(backend, 'backend_version', ''))]
+    # The simulation method changes the simulator's qubit limit and basis gates
+    method = getattr(getattr(backend, 'options', None), 'method', None)
+    if method is not None:
+        parts.append(str(method))
+    target = getattr(backend, 'target', None)
+    if target is not None:
+        coupling_map = target.build_coupling_map()
+        parts += [str(target.num_qubits),
+                  str(sorted(target.operation_names)),
+                  str(sorted(coupling_map.get_edges())) if coupling_map is not None else 'all-to-all']
+    else:
+        config = backend.configuration()
+        parts += [str(config.n_qubits),
+                  str(sorted(config.basis_gates)),
+                  str(sorted(map(tuple, config.coupling_map or [])))]
+    return '|'.join(parts)
+
+class TranspileCache:
+    def __init__(self, max_size=256, cache_dir=None):
+        self.max_size = max_size
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        
+        self._circuits = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def key(self, circuit, backend, optimization_level=None):
+        material = f"{circuit_hash(circuit)}|{backend_fingerprint(backend)}|{optimization_level}"
+        return hashlib.sha256(material.encode()).hexdigest()
+    
+    def _remember(self, key, compiled):
+        with self._lock:
+            self._circuits[key] = compiled
+            self._circuits.move_to_end(key)
+            while len(self._circuits) > self.max_size:
+                self._circuits.popitem(last=False)
+                self.evictions += 1
+    
+    def transpile(self, circuit, backend, optimization_level=None):
+        """Return the compiled circuit, transpiling only on a cache miss"""
+        key = self.key(circuit, backend, optimization_level)
+        with self._lock:
+            compiled = self._circuits.get(key)
+            if compiled is not None:
+                self._circuits.move_to_end(key)
+                self.hits += 1
+                return compiled
+        
+        path = os.path.join(self.cache_dir, f"{key}.qpy") if self.cache_dir else None
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                compiled = qpy.load(f)[0]
+            self._remember(key, compiled)
+            with self._lock:
+                self.hits += 1
+                self.disk_hits += 1
+            return compiled
+        
+        compiled = transpile(circuit, backend, optimization_level=optimization_level)
+        self._remember(key, compiled)
+        with self._lock:
+            self.misses += 1
+        
+        if path:
+            # Write then rename so a concurrent reader never loads a partial file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                qpy.dump(compiled, f)
+            os.replace(tmp_path, path)
+        return compiled
+    
+    def clear(self):
+        with self._lock:
+            self._circuits.clear()
+    
+    def stats(self):
+        """Hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._circuits),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
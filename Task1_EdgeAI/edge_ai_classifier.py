@@ -1,18 +1,80 @@
 # Edge AI Recyclable Waste Classifier
-import tensorflow as tf
 import numpy as np
 from PIL import Image
+import io
 import time
 
+from fast_preprocessing import PreprocessingEngine
+from instrumentation import CLASSIFY_STAGES, StageMetrics
+from result_cache import ResultCache, content_hash, file_hash
+
+# Output order of the model; recyclable_model_training.py trains in this order
+CLASS_NAMES = ['Plastic', 'Paper', 'Glass', 'Metal']
+
+def load_interpreter_class():
+    """Return the TFLite Interpreter class, importing as little as possible
+    
+    The standalone tflite_runtime package loads in a fraction of the time of
+    full TensorFlow, so it is preferred when installed.
+    """
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
 class EdgeAIClassifier:
-    def __init__(self, model_path):
-        self.interpreter = tf.lite.Interpreter(model_path=model_path)
+    def __init__(self, model_path=None, num_threads=None, model_content=None,
+                 fast_preprocessing=False, cache=None, metrics=None):
+        # model_content lets several classifiers share one in-memory model buffer
+        Interpreter = load_interpreter_class()
+        self.interpreter = Interpreter(model_path=model_path,
+                                       model_content=model_content,
+                                       num_threads=num_threads)
         self.interpreter.allocate_tensors()
         
         self.input_details = self.interpreter.get_input_details()
         self.output_details = self.interpreter.get_output_details()
+        self.batch_size = int(self.input_details[0]['shape'][0])
+        
+        # Quantization parameters; a scale of 0.0 marks a float tensor
+        self.input_dtype = self.input_details[0]['dtype']
+        self.input_scale, self.input_zero_point = self.input_details[0]['quantization']
+        self.output_scale, self.output_zero_point = self.output_details[0]['quantization']
+        
+        self.class_names = list(CLASS_NAMES)
+        
+        # Optional draft-decoding preprocessor that reuses one input buffer
+        self.preprocessor = None
+        if fast_preprocessing:
+            _, height, width, _ = self.input_details[0]['shape']
+            self.preprocessor = PreprocessingEngine(
+                target_size=(width, height),
+                input_dtype=self.input_dtype,
+                quantization=(self.input_scale, self.input_zero_point))
+        
+        # Optional ResultCache; keys include the model hash so a new model never
+        # serves results computed by an old one
+        self.cache = cache
+        self.model_hash = None
+        if cache is not None:
+            self.model_hash = (content_hash(model_content) if model_content is not None
+                               else file_hash(model_path))
         
-        self.class_names = ['Plastic', 'Paper', 'Glass', 'Metal']
+        # Instrumentation hooks, called as hook(stage, duration_ns); with none
+        # registered classify skips timing altogether
+        self.hooks = []
+        self.metrics = metrics
+        if metrics is not None:
+            self.add_hook(metrics)
+    
+    def add_hook(self, hook):
+        """Register a callable hook(stage, duration_ns) for per-stage timings"""
+        self.hooks.append(hook)
+    
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
     
     def preprocess_image(self, image_path):
         """Preprocess image for the model"""
@@ -22,33 +84,235 @@ class EdgeAIClassifier:
         image_array = np.expand_dims(image_array, axis=0)
         return image_array
     
+    def _quantize_input(self, input_data):
+        """Convert float [0, 1] pixels to the interpreter input dtype"""
+        if self.input_scale == 0.0 or input_data.dtype == self.input_dtype:
+            return input_data.astype(self.input_dtype, copy=False)
+        info = np.iinfo(self.input_dtype)
+        quantized = np.round(input_data / self.input_scale) + self.input_zero_point
+        return np.clip(quantized, info.min, info.max).astype(self.input_dtype)
+    
+    def _dequantize_output(self, output_data):
+        """Convert integer model outputs back to float scores"""
+        if self.output_scale == 0.0:
+            return output_data
+        return (output_data.astype(np.float32) - self.output_zero_point) * self.output_scale
+    
+    def _resize_batch(self, batch_size):
+        """Resize the interpreter input tensor to a new batch dimension"""
+        if batch_size == self.batch_size:
+            return
+        input_shape = list(self.input_details[0]['shape'])
+        input_shape[0] = batch_size
+        self.interpreter.resize_tensor_input(self.input_details[0]['index'], input_shape)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+        self.batch_size = batch_size
+    
+    def _format_result(self, predictions, inference_time):
+        """Build the result dict for one item's predictions"""
+        predicted_class = np.argmax(predictions)
+        confidence = predictions[predicted_class]
+        
+        return {
+            'class': self.class_names[predicted_class],
+            'confidence': float(confidence),
+            'inference_time_ms': inference_time * 1000,
+            'all_predictions': dict(zip(self.class_names, predictions))
+        }
+    
+    def _cache_key(self, item):
+        """Return (item to process, cache key) for a path or array"""
+        if isinstance(item, np.ndarray):
+            item_bytes = np.ascontiguousarray(item).data
+            return item, self.cache.make_key(self.model_hash, item_bytes,
+                                             meta=(item.dtype.str, item.shape))
+        
+        # Read the file once: hash the bytes and decode from the same buffer
+        with open(item, 'rb') as f:
+            data = f.read()
+        return io.BytesIO(data), self.cache.make_key(self.model_hash, data)
+    
+    def _copy_result(self, result, **extra):
+        """Copy of a cached result, so callers cannot mutate the cache entry"""
+        result = dict(result, **extra)
+        result['all_predictions'] = dict(result['all_predictions'])
+        return result
+    
+    def _cached_result(self, result):
+        return self._copy_result(result, cached=True)
+    
+    def _serializable(self, result):
+        """Result dict with plain floats so it can be cached on disk"""
+        result = dict(result)
+        result['all_predictions'] = {name: float(score)
+                                     for name, score in result['all_predictions'].items()}
+        return result
+    
     def classify(self, image_path):
         """Classify recyclable item"""
+        if self.cache is None:
+            return self._classify(image_path)
+        
+        image, key = self._cache_key(image_path)
+        result = self.cache.get(key)
+        if result is not None:
+            return self._cached_result(result)
+        result = self._serializable(self._classify(image))
+        self.cache.put(key, result)
+        return self._copy_result(result)
+    
+    def _classify(self, image_path):
+        if self.hooks:
+            return self._classify_instrumented(image_path)
+        
         # Preprocess image
-        input_data = self.preprocess_image(image_path)
+        if self.preprocessor is not None:
+            input_data = self.preprocessor.preprocess(image_path)
+        else:
+            input_data = self._quantize_input(self.preprocess_image(image_path))
+        self._resize_batch(1)
         
         # Set input tensor
         self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
         
-        # Run inference
-        start_time = time.time()
+        # Run inference (perf_counter is monotonic, unlike time.time)
+        start_time = time.perf_counter()
         self.interpreter.invoke()
-        inference_time = time.time() - start_time
+        inference_time = time.perf_counter() - start_time
         
         # Get output
         output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
-        predictions = output_data[0]
+        predictions = self._dequantize_output(output_data[0])
         
         # Get top prediction
-        predicted_class = np.argmax(predictions)
-        confidence = predictions[predicted_class]
+        return self._format_result(predictions, inference_time)
+    
+    def _classify_instrumented(self, image_path):
+        """classify() with every stage timed and reported to the hooks"""
+        clock = time.perf_counter_ns
+        marks = [clock()]
         
-        return {
-            'class': self.class_names[predicted_class],
-            'confidence': float(confidence),
-            'inference_time_ms': inference_time * 1000,
-            'all_predictions': dict(zip(self.class_names, predictions))
-        }
+        if hasattr(image_path, 'read'):
+            data = image_path.read()
+        else:
+            with open(image_path, 'rb') as f:
+                data = f.read()
+        marks.append(clock())  # load
+        
+        if self.preprocessor is not None:
+            image = self.preprocessor.decode_draft(io.BytesIO(data))
+        else:
+            image = Image.open(io.BytesIO(data)).convert('RGB')
+        marks.append(clock())  # decode
+        
+        if self.preprocessor is not None:
+            image = self.preprocessor.resize(image)
+        else:
+            image = image.resize((32, 32))
+        marks.append(clock())  # resize
+        
+        if self.preprocessor is not None:
+            self.preprocessor.scale_into(image, self.preprocessor.buffer[0])
+            input_data = self.preprocessor.buffer[:1]
+        else:
+            input_data = np.expand_dims(np.array(image, dtype=np.float32) / 255.0, axis=0)
+            input_data = self._quantize_input(input_data)
+        marks.append(clock())  # normalize
+        
+        self._resize_batch(1)
+        self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
+        marks.append(clock())  # set_tensor
+        
+        self.interpreter.invoke()
+        marks.append(clock())  # invoke
+        invoke_ns = marks[-1] - marks[-2]
+        
+        output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
+        predictions = self._dequantize_output(output_data[0])
+        marks.append(clock())  # get_tensor
+        
+        result = self._format_result(predictions, invoke_ns / 1e9)
+        marks.append(clock())  # postprocess
+        
+        for hook in self.hooks:
+            for stage, start, end in zip(CLASSIFY_STAGES, marks, marks[1:]):
+                hook(stage, end - start)
+        return result
+    
+    def classify_batch(self, images, batch_size=32):
+        """Classify many items with one interpreter invoke per batch
+        
+        `images` may mix image paths and arrays already shaped like the
+        output of preprocess_image (with or without the leading batch axis).
+        Float arrays are quantized automatically for integer-input models.
+        Each result carries the per-item share of the batch inference time
+        plus the batch throughput in images/sec.
+        """
+        if self.cache is None:
+            return self._classify_batch(images, batch_size)
+        
+        results = [None] * len(images)
+        pending, pending_items, pending_keys = [], [], []
+        for i, item in enumerate(images):
+            item, key = self._cache_key(item)
+            result = self.cache.get(key)
+            if result is not None:
+                results[i] = self._cached_result(result)
+            else:
+                pending.append(i)
+                pending_items.append(item)
+                pending_keys.append(key)
+        
+        for i, key, result in zip(pending, pending_keys,
+                                  self._classify_batch(pending_items, batch_size)):
+            result = self._serializable(result)
+            self.cache.put(key, result)
+            results[i] = self._copy_result(result)
+        return results
+    
+    def _classify_batch(self, images, batch_size):
+        results = []
+        if not images:
+            return results
+        item_shape = tuple(self.input_details[0]['shape'][1:])
+        
+        # Keep the input tensor at a fixed batch size: a short last chunk is
+        # padded rather than resized, since every resize reallocates tensors
+        self._resize_batch(batch_size)
+        input_data = np.zeros((batch_size,) + item_shape, dtype=self.input_dtype)
+        
+        for start in range(0, len(images), batch_size):
+            chunk = images[start:start + batch_size]
+            
+            # Pack preprocessed items into one contiguous batch of the input dtype
+            for i, item in enumerate(chunk):
+                if isinstance(item, np.ndarray):
+                    input_data[i] = self._quantize_input(item.reshape(item_shape))
+                elif self.preprocessor is not None:
+                    self.preprocessor.preprocess_into(item, input_data[i])
+                else:
+                    input_data[i] = self._quantize_input(self.preprocess_image(item)[0])
+            
+            self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
+            
+            # Run inference once for the whole batch
+            start_time = time.perf_counter()
+            self.interpreter.invoke()
+            inference_time = time.perf_counter() - start_time
+            
+            # Padded rows at the end of the last chunk are dropped
+            output_data = self._dequantize_output(
+                self.interpreter.get_tensor(self.output_details[0]['index'])[:len(chunk)])
+            throughput = len(chunk) / inference_time if inference_time > 0 else float('inf')
+            
+            for predictions in output_data:
+                result = self._format_result(predictions, inference_time / len(chunk))
+                result['throughput_ips'] = throughput
+                results.append(result)
+        
+        return results
 
 # Example usage
 if __name__ == "__main__":
@@ -62,6 +326,27 @@ if __name__ == "__main__":
         print(f"Confidence: {result['confidence']:.4f}")
         print(f"Inference Time: {result['inference_time_ms']:.2f} ms")
         print("All predictions:", result['all_predictions'])
+        
+        # Classify a burst of frames in one batched invoke
+        burst = ['sample_images/plastic_bottle.jpg'] * 8
+        batch_results = classifier.classify_batch(burst, batch_size=8)
+        print(f"Batch of {len(batch_results)} items: "
+              f"{batch_results[0]['inference_time_ms']:.2f} ms/item, "
+              f"{batch_results[0]['throughput_ips']:.1f} images/sec")
+        
+        # Re-photographed items are served from the content-hash cache
+        cached_classifier = EdgeAIClassifier('recyclable_model.tflite', cache=ResultCache())
+        for _ in range(3):
+            cached_classifier.classify('sample_images/plastic_bottle.jpg')
+        print("Cache stats:", cached_classifier.cache.stats())
+        
+        # Per-stage timings exported in Prometheus text format
+        metrics = StageMetrics()
+        instrumented = EdgeAIClassifier('recyclable_model.tflite', metrics=metrics)
+        for _ in range(10):
+            instrumented.classify('sample_images/plastic_bottle.jpg')
+        print("Stage timings:", metrics.summary())
+        metrics.write('edge_ai_metrics.prom')
     except FileNotFoundError:
         print("Sample image not found. Testing with random data...")
         # Create a test case with random data
@@ -0,0 +1,92 @@
+# Per-stage timing histograms for the edge classifier
+import bisect
+import http.server
+import os
+import threading
+
+CLASSIFY_STAGES = ('load', 'decode', 'resize', 'normalize',
+                   'set_tensor', 'invoke', 'get_tensor', 'postprocess')
+
+# Bucket upper bounds in nanoseconds, 10us to ~5s
+DEFAULT_BUCKETS_NS = tuple(int(10_000 * 2 ** i) for i in range(20))
+
+class Histogram:
+    def __init__(self, buckets_ns=DEFAULT_BUCKETS_NS):
+        self.buckets_ns = buckets_ns
+        self.counts = [0] * (len(buckets_ns) + 1)  # last slot is +Inf
+        self.sum_ns = 0
+        self.count = 0
+    
+    def observe(self, duration_ns):
+        self.counts[bisect.bisect_left(self.buckets_ns, duration_ns)] += 1
+        self.sum_ns += duration_ns
+        self.count += 1
+
+class StageMetrics:
+    """Instrumentation hook that collects a latency histogram per stage
+    
+    Register it with EdgeAIClassifier(metrics=...) or add_hook(); it is called
+    as hook(stage, duration_ns) for every timed stage.
+    """
+    
+    def __init__(self, namespace='edge_ai', buckets_ns=DEFAULT_BUCKETS_NS):
+        self.namespace = namespace
+        self.buckets_ns = buckets_ns
+        self.histograms = {}
+        self._lock = threading.Lock()
+    
+    def __call__(self, stage, duration_ns):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram(self.buckets_ns)
+            histogram.observe(duration_ns)
+    
+    def to_prometheus(self):
+        """Render all histograms in the Prometheus text exposition format"""
+        name = f'{self.namespace}_stage_duration_seconds'
+        lines = [f'# HELP {name} Time spent in each classification stage.',
+                 f'# TYPE {name} histogram']
+        with self._lock:
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets_ns, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{bound / 1e9:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum_ns / 1e9:.9f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+    
+    def write(self, path):
+        """Atomically write the metrics file, e.g. for node_exporter's textfile collector"""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+    
+    def serve(self, port=9108, host=''):
+        """Expose /metrics over HTTP from a daemon thread"""
+        metrics = self
+        
+        class MetricsHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+    
+    def summary(self):
+        """Mean milliseconds and call count per stage"""
+        with self._lock:
+            return {stage: {'count': h.count, 'mean_ms': h.sum_ns / h.count / 1e6}
+                    for stage, h in self.histograms.items() if h.count}
@@ -0,0 +1,77 @@
+# Interpreter pool for concurrent edge classification
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from edge_ai_classifier import EdgeAIClassifier
+
+class InterpreterPool:
+    def __init__(self, model_path, pool_size=None, num_threads=1, cache=None,
+                 metrics=None):
+        # Read the model once; every interpreter is built from this one bytes object
+        with open(model_path, 'rb') as f:
+            self.model_content = f.read()
+        
+        self.pool_size = pool_size or os.cpu_count() or 1
+        self.num_threads = num_threads
+        
+        # Each worker owns its own interpreter; a TFLite interpreter is not thread safe
+        self._idle = queue.Queue()
+        for _ in range(self.pool_size):
+            # ResultCache and StageMetrics are thread safe, so workers share them
+            self._idle.put(EdgeAIClassifier(model_content=self.model_content,
+                                            num_threads=num_threads,
+                                            cache=cache, metrics=metrics))
+        
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size,
+                                            thread_name_prefix='edge-ai')
+    
+    def _run(self, method, *args, **kwargs):
+        """Check out an idle classifier, run one call on it and return it"""
+        classifier = self._idle.get()
+        try:
+            return getattr(classifier, method)(*args, **kwargs)
+        finally:
+            self._idle.put(classifier)
+    
+    def submit(self, method, *args, **kwargs):
+        """Run any EdgeAIClassifier method on a pooled interpreter, returning a future"""
+        return self._executor.submit(self._run, method, *args, **kwargs)
+    
+    def classify_async(self, image_path):
+        """Classify one item on the pool, returning a future"""
+        return self.submit('classify', image_path)
+    
+    def classify_batch_async(self, images, batch_size=32):
+        """Classify a batch on one pooled interpreter, returning a future"""
+        return self.submit('classify_batch', images, batch_size=batch_size)
+    
+    def map(self, image_paths):
+        """Classify many items concurrently, preserving input order"""
+        futures = [self.classify_async(path) for path in image_paths]
+        return [future.result() for future in futures]
+    
+    def shutdown(self, wait=True):
+        """Stop accepting work and release the worker threads"""
+        self._executor.shutdown(wait=wait)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+# Example usage
+if __name__ == "__main__":
+    # Saturate every core: one single-threaded interpreter per core
+    with InterpreterPool('recyclable_model.tflite', num_threads=1) as pool:
+        print(f"Interpreter pool size: {pool.pool_size}")
+        
+        images = ['sample_images/plastic_bottle.jpg'] * (pool.pool_size * 4)
+        try:
+            results = pool.map(images)
+            print(f"Classified {len(results)} items concurrently")
+            print(f"First result: {results[0]['class']} "
+                  f"({results[0]['confidence']:.4f})")
+        except FileNotFoundError:
+            print("Sample image not found.")
@@ -1,30 +1,82 @@
 # Convert Keras model to TensorFlow Lite
+import os
+import time
+
 import tensorflow as tf
 import numpy as np
 
-def convert_to_tflite():
+QUANTIZATION_MODES = ('float32', 'dynamic', 'float16', 'int8')
+
+def load_calibration_data():
+    """Load the training/test images used for calibration and evaluation"""
+    # Same CIFAR-10 stand-in as recyclable_model_training.py
+    (x_train, y_train), (x_test, y_test) = tf.keras.datasets.cifar10.load_data()
+    return (x_train, y_train), (x_test, y_test)
+
+def representative_dataset_gen(x_train, num_samples=200):
+    """Build a representative dataset generator from training images"""
+    indices = np.random.default_rng(42).choice(len(x_train), num_samples, replace=False)
+    
+    def generator():
+        for i in indices:
+            # Calibrate on the same [0, 1] float inputs the model was trained on
+            yield [x_train[i:i + 1].astype(np.float32) / 255.0]
+    
+    return generator
+
+def convert_to_tflite(quantization='dynamic', model_path='recyclable_model.h5',
+                      output_path='recyclable_model.tflite', x_train=None,
+                      num_calibration_samples=200):
+    """Convert the Keras model with the requested quantization mode
+    
+    'float32' applies no optimization, 'dynamic' quantizes weights only,
+    'float16' stores weights as float16 and 'int8' produces a full-integer
+    model with uint8 input and output calibrated on `x_train`.
+    """
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode {quantization!r}, "
+                         f"expected one of {QUANTIZATION_MODES}")
+    
     # Load the trained model
-    model = tf.keras.models.load_model('recyclable_model.h5')
+    model = tf.keras.models.load_model(model_path)
     
     # Convert to TensorFlow Lite
     converter = tf.lite.TFLiteConverter.from_keras_model(model)
     
     # Apply optimization for smaller size and faster execution
-    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization != 'float32':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    
+    if quantization == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'int8':
+        if x_train is None:
+            (x_train, _), _ = load_calibration_data()
+        converter.representative_dataset = representative_dataset_gen(
+            x_train, num_calibration_samples)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.uint8
+        converter.inference_output_type = tf.uint8
     
     # Convert the model
     tflite_model = converter.convert()
     
-    # Save the TensorFlow Lite model
-    with open('recyclable_model.tflite', 'wb') as f:
+    # Save the TensorFlow Lite model; write then rename so a ModelRegistry
+    # watching output_path never loads a half-written file
+    staging_path = output_path + '.tmp'
+    with open(staging_path, 'wb') as f:
         f.write(tflite_model)
+    os.replace(staging_path, output_path)
     
-    print("Model converted to TensorFlow Lite successfully!")
+    print(f"Model converted to TensorFlow Lite successfully! ({quantization})")
     print(f"Model size: {len(tflite_model)} bytes")
+    return output_path
 
-def test_tflite_model():
+def test_tflite_model(model_path='recyclable_model.tflite', x_test=None, y_test=None,
+                      n_runs=50):
+    """Smoke-test a converted model, optionally measuring accuracy and latency"""
     # Load TFLite model and allocate tensors
-    interpreter = tf.lite.Interpreter(model_path='recyclable_model.tflite')
+    interpreter = tf.lite.Interpreter(model_path=model_path)
     interpreter.allocate_tensors()
     
     # Get input and output tensors
@@ -34,9 +86,14 @@ def test_tflite_model():
     print("Input details:", input_details)
     print("Output details:", output_details)
     
-    # Test with sample data
+    # Test with sample data in the model's input dtype
     input_shape = input_details[0]['shape']
-    input_data = np.array(np.random.random_sample(input_shape), dtype=np.float32)
+    input_dtype = input_details[0]['dtype']
+    if np.issubdtype(input_dtype, np.integer):
+        info = np.iinfo(input_dtype)
+        input_data = np.random.randint(info.min, info.max + 1, input_shape).astype(input_dtype)
+    else:
+        input_data = np.array(np.random.random_sample(input_shape), dtype=input_dtype)
     interpreter.set_tensor(input_details[0]['index'], input_data)
     
     interpreter.invoke()
@@ -44,8 +101,49 @@ def test_tflite_model():
     output_data = interpreter.get_tensor(output_details[0]['index'])
     print(f"Output predictions: {output_data}")
     
-    return interpreter
+    if x_test is None:
+        return interpreter
+    
+    # Single-image latency, as seen by EdgeAIClassifier.classify
+    timings = []
+    for _ in range(n_runs):
+        start_time = time.perf_counter()
+        interpreter.invoke()
+        timings.append(time.perf_counter() - start_time)
+    
+    # Accuracy through the classifier, which handles scale and zero-point
+    from edge_ai_classifier import EdgeAIClassifier
+    classifier = EdgeAIClassifier(model_path)
+    results = classifier.classify_batch(list(x_test.astype(np.float32) / 255.0))
+    predicted = np.array([classifier.class_names.index(r['class']) for r in results])
+    
+    return {
+        'model_path': model_path,
+        'size_bytes': os.path.getsize(model_path),
+        'accuracy': float(np.mean(predicted == np.ravel(y_test))),
+        'latency_ms': float(np.median(timings) * 1000),
+        'input_dtype': np.dtype(input_dtype).name,
+    }
+
+def compare_quantization_variants(modes=QUANTIZATION_MODES, n_eval_samples=1000):
+    """Convert every quantization variant and report accuracy, latency and size"""
+    (x_train, _), (x_test, y_test) = load_calibration_data()
+    x_test, y_test = x_test[:n_eval_samples], y_test[:n_eval_samples]
+    
+    report = {}
+    for mode in modes:
+        output_path = f'recyclable_model_{mode}.tflite'
+        convert_to_tflite(mode, output_path=output_path, x_train=x_train)
+        report[mode] = test_tflite_model(output_path, x_test, y_test)
+    
+    print(f"\n{'Variant':10s} {'Size (KB)':>10s} {'Latency (ms)':>13s} {'Accuracy':>9s} {'Input':>8s}")
+    for mode, stats in report.items():
+        print(f"{mode:10s} {stats['size_bytes'] / 1024:10.1f} {stats['latency_ms']:13.3f} "
+              f"{stats['accuracy']:9.4f} {stats['input_dtype']:>8s}")
+    
+    return report
 
 if __name__ == "__main__":
     convert_to_tflite()
     test_tflite_model()
+    compare_quantization_variants()
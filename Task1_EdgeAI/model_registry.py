@@ -0,0 +1,196 @@
+# Hot-reloading model registry for the edge classifier
+import collections
+import glob
+import os
+import shutil
+import threading
+
+import numpy as np
+
+from edge_ai_classifier import EdgeAIClassifier
+
+class ModelVersion:
+    def __init__(self, version, path, classifier):
+        self.version = version
+        self.path = path
+        self.classifier = classifier
+    
+    def __repr__(self):
+        return f"ModelVersion({self.version!r}, {self.path!r})"
+
+def warm_up(classifier):
+    """Run one dummy invoke sized from input_details so the first real call is fast"""
+    details = classifier.input_details[0]
+    dummy = np.zeros(details['shape'], dtype=details['dtype'])
+    classifier.interpreter.set_tensor(details['index'], dummy)
+    classifier.interpreter.invoke()
+
+class ModelRegistry:
+    def __init__(self, path, poll_interval=1.0, history=3, **classifier_kwargs):
+        # `path` is a single model file, or a registry directory whose *.tflite
+        # files are versions ordered by name (e.g. model_v0001.tflite, model_v0002.tflite)
+        self.path = path
+        self.poll_interval = poll_interval
+        self.classifier_kwargs = classifier_kwargs
+        
+        # Previous versions, most recent last, kept loaded for instant rollback
+        self.history = collections.deque(maxlen=history)
+        self.reloads = 0
+        self.failed_reloads = 0
+        
+        self._signature = None
+        self._lock = threading.Lock()  # serializes reloads, never taken by classify
+        self._stop_event = threading.Event()
+        self._watcher = None
+        
+        self._active = None
+        if not self.check():
+            raise FileNotFoundError(f"No model found at {path}")
+    
+    def _latest(self):
+        """Return (version, path, signature) of the newest model, or None"""
+        if os.path.isdir(self.path):
+            paths = sorted(glob.glob(os.path.join(self.path, '*.tflite')))
+            if not paths:
+                return None
+            model_path = paths[-1]
+            version = os.path.splitext(os.path.basename(model_path))[0]
+        elif os.path.exists(self.path):
+            model_path = self.path
+            version = None
+        else:
+            return None
+        stat = os.stat(model_path)
+        signature = (model_path, stat.st_mtime_ns, stat.st_size)
+        return version or f"{stat.st_mtime_ns}", model_path, signature
+    
+    def _load(self, version, model_path):
+        """Build and warm up a classifier for one version, off the hot path"""
+        # Read the bytes once so a later overwrite of the file cannot affect it
+        with open(model_path, 'rb') as f:
+            model_content = f.read()
+        classifier = EdgeAIClassifier(model_content=model_content, **self.classifier_kwargs)
+        warm_up(classifier)
+        return ModelVersion(version, model_path, classifier)
+    
+    def check(self):
+        """Load the newest model if it changed, returning True when a version was swapped in"""
+        with self._lock:
+            latest = self._latest()
+            if latest is None or latest[2] == self._signature:
+                return False
+            version, model_path, signature = latest
+            
+            # Remember the signature even if loading fails, so a broken file is
+            # not retried on every poll; a fixed file gets a new signature
+            self._signature = signature
+            try:
+                loaded = self._load(version, model_path)
+            except (OSError, ValueError, RuntimeError) as error:
+                if self._active is None:
+                    raise
+                self.failed_reloads += 1
+                print(f"Keeping model {self._active.version}: failed to load {model_path}: {error}")
+                return False
+            
+            if self._active is not None:
+                self.history.append(self._active)
+                self.reloads += 1
+            # A single reference assignment: callers see either the old or the new model
+            self._active = loaded
+            print(f"Serving model {loaded.version}")
+            return True
+    
+    def rollback(self):
+        """Switch back to the previous version instantly, returning it"""
+        with self._lock:
+            if not self.history:
+                raise RuntimeError("No previous model version to roll back to")
+            self._active = self.history.pop()
+            print(f"Rolled back to model {self._active.version}")
+            return self._active
+    
+    def publish(self, model_path):
+        """Copy a model into the registry directory as the next version"""
+        if not os.path.isdir(self.path):
+            raise ValueError("publish() needs a registry directory, not a single model file")
+        existing = sorted(glob.glob(os.path.join(self.path, 'model_v*.tflite')))
+        number = int(os.path.basename(existing[-1])[7:-7]) + 1 if existing else 1
+        target = os.path.join(self.path, f"model_v{number:04d}.tflite")
+        # Copy under a name the watcher ignores, then rename into place atomically
+        staging = target + '.tmp'
+        shutil.copyfile(model_path, staging)
+        os.replace(staging, target)
+        return target
+    
+    @property
+    def active(self):
+        return self._active
+    
+    @property
+    def version(self):
+        return self._active.version
+    
+    @property
+    def classifier(self):
+        return self._active.classifier
+    
+    def classify(self, image_path):
+        """Classify with the current version; a swap mid-call never affects this call"""
+        return self._active.classifier.classify(image_path)
+    
+    def classify_batch(self, images, batch_size=32):
+        return self._active.classifier.classify_batch(images, batch_size=batch_size)
+    
+    def __getattr__(self, name):
+        # class_names, input_details, ... come from the current version, so the
+        # registry can stand in for an EdgeAIClassifier (e.g. in StreamingClassifier)
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._active.classifier, name)
+    
+    def _watch(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.check()
+            except OSError as error:
+                # e.g. the file was replaced between stat and open; retry next poll
+                print(f"Model watcher error: {error}")
+    
+    def start(self):
+        """Watch for new versions in a background thread"""
+        if self._watcher is None:
+            self._stop_event.clear()
+            self._watcher = threading.Thread(target=self._watch, name='model-registry',
+                                             daemon=True)
+            self._watcher.start()
+        return self
+    
+    def stop(self):
+        if self._watcher is not None:
+            self._stop_event.set()
+            self._watcher.join()
+            self._watcher = None
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+# Example usage
+if __name__ == "__main__":
+    import time
+    
+    with ModelRegistry('recyclable_model.tflite', poll_interval=0.5) as registry:
+        print(f"Serving {registry.version}; re-run model_conversion.py to deploy a new model")
+        try:
+            for _ in range(20):
+                result = registry.classify('sample_images/plastic_bottle.jpg')
+                print(f"[{registry.version}] {result['class']} ({result['confidence']:.4f})")
+                time.sleep(1)
+        except FileNotFoundError:
+            print("Sample image not found.")
+        
+        if registry.history:
+            registry.rollback()
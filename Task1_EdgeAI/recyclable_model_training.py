@@ -1,32 +1,154 @@
 # Recyclable Waste Classification - TensorFlow Lite
 import tensorflow as tf
 import numpy as np
-import matplotlib.pyplot as plt
 from tensorflow.keras import layers, models
+import argparse
+import os
 import pathlib
 
-print("TensorFlow version:", tf.__version__)
+from edge_ai_classifier import CLASS_NAMES
 
-# Create a synthetic dataset (in practice, use Kaggle waste dataset)
-def create_synthetic_data():
-    # This would be replaced with actual dataset loading
-    # Using CIFAR-10 for simulation purposes
-    (x_train, y_train), (x_test, y_test) = tf.keras.datasets.cifar10.load_data()
+AUTOTUNE = tf.data.AUTOTUNE
+IMAGE_SIZE = (32, 32)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+def _normalize(images, labels):
+    """Scale uint8 batches to [0, 1] on the fly"""
+    return tf.cast(images, tf.float32) / 255.0, labels
+
+def _augment(image, label):
+    image = tf.image.random_flip_left_right(image)
+    image = tf.image.random_brightness(tf.cast(image, tf.float32), 0.1 * 255)
+    return tf.cast(tf.clip_by_value(image, 0, 255), tf.uint8), label
+
+def _decode_image(encoded, label):
+    """Decode and resize to the model input, keeping uint8 storage"""
+    image = tf.io.decode_image(encoded, channels=3, expand_animations=False)
+    image = tf.image.resize(image, IMAGE_SIZE)
+    return tf.cast(tf.round(image), tf.uint8), label
+
+def _read_file(path, label):
+    return tf.io.read_file(path), label
+
+def _parse_tfrecord(record):
+    features = tf.io.parse_single_example(record, {
+        'image': tf.io.FixedLenFeature([], tf.string),
+        'label': tf.io.FixedLenFeature([], tf.int64),
+    })
+    return features['image'], features['label']
+
+def _finish_pipeline(dataset, batch_size, training, cache_file=None):
+    """Cache decoded uint8 images, then shuffle/augment, batch, normalize, prefetch
+    
+    Decoded images are cached to `cache_file` on local disk, so later epochs
+    skip file reads and JPEG decoding. Without a cache file nothing is
+    cached: an in-memory cache would hold the whole dataset in RAM.
+    """
+    if cache_file:
+        os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+        dataset = dataset.cache(cache_file)
+    if training:
+        dataset = dataset.shuffle(10000)
+        dataset = dataset.map(_augment, num_parallel_calls=AUTOTUNE)
+    dataset = dataset.batch(batch_size)
+    dataset = dataset.map(_normalize, num_parallel_calls=AUTOTUNE)
+    return dataset.prefetch(AUTOTUNE)
+
+def list_image_files(data_dir, class_names=CLASS_NAMES):
+    """Return (paths, labels) for a data_dir/<class>/<image> tree
+    
+    Labels are indices into `class_names` (default: EdgeAIClassifier's output
+    order), matched to directory names case-insensitively, so the trained
+    model's outputs line up with the classifier's class names.
+    """
+    directories = {entry.name.lower(): entry.name
+                   for entry in os.scandir(data_dir) if entry.is_dir()}
+    wanted = [name.lower() for name in class_names]
+    missing = [name for name in class_names if name.lower() not in directories]
+    unexpected = sorted(name for key, name in directories.items() if key not in wanted)
+    if missing or unexpected:
+        raise ValueError(f"Class directories in {data_dir} do not match {list(class_names)}: "
+                         f"missing {missing}, unexpected {unexpected}")
     
-    # Normalize pixel values
-    x_train = x_train.astype('float32') / 255.0
-    x_test = x_test.astype('float32') / 255.0
+    paths, labels = [], []
+    for label, class_name in enumerate(class_names):
+        directory = os.path.join(data_dir, directories[class_name.lower()])
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    paths.append(os.path.join(root, name))
+                    labels.append(label)
+    return paths, labels
+
+def load_image_dataset(data_dir, batch_size=32, validation_split=0.2, cache_dir=None,
+                       seed=42, class_names=CLASS_NAMES):
+    """Build train/validation tf.data pipelines from an image directory tree"""
+    paths, labels = list_image_files(data_dir, class_names)
+    order = np.random.default_rng(seed).permutation(len(paths))
+    paths, labels = np.array(paths)[order], np.array(labels)[order]
+    n_val = int(len(paths) * validation_split)
+    
+    splits = {}
+    for split, (split_paths, split_labels) in {
+        'train': (paths[n_val:], labels[n_val:]),
+        'val': (paths[:n_val], labels[:n_val]),
+    }.items():
+        dataset = tf.data.Dataset.from_tensor_slices((split_paths, split_labels))
+        dataset = dataset.map(_read_file, num_parallel_calls=AUTOTUNE)
+        dataset = dataset.map(_decode_image, num_parallel_calls=AUTOTUNE)
+        cache_file = os.path.join(cache_dir, f'{split}.cache') if cache_dir else None
+        splits[split] = _finish_pipeline(dataset, batch_size, split == 'train', cache_file)
     
-    return (x_train, y_train), (x_test, y_test)
+    print(f"Found {len(paths)} images in {len(class_names)} classes: {list(class_names)}")
+    return splits['train'], splits['val']
 
-# Load data
-(x_train, y_train), (x_test, y_test) = create_synthetic_data()
+def load_tfrecord_dataset(data_dir, batch_size=32, cache_dir=None):
+    """Build train/validation pipelines from train-*/val-* TFRecord shards
+    
+    Each record holds an encoded 'image' and an int64 'label' indexing the
+    class order the model is trained with (CLASS_NAMES by default).
+    """
+    splits = {}
+    for split in ('train', 'val'):
+        shards = tf.data.Dataset.list_files(os.path.join(data_dir, f'{split}-*.tfrecord*'),
+                                            shuffle=split == 'train')
+        dataset = shards.interleave(tf.data.TFRecordDataset, num_parallel_calls=AUTOTUNE,
+                                    deterministic=split != 'train')
+        dataset = dataset.map(_parse_tfrecord, num_parallel_calls=AUTOTUNE)
+        dataset = dataset.map(_decode_image, num_parallel_calls=AUTOTUNE)
+        cache_file = os.path.join(cache_dir, f'{split}.cache') if cache_dir else None
+        splits[split] = _finish_pipeline(dataset, batch_size, split == 'train', cache_file)
+    return splits['train'], splits['val']
+
+def load_synthetic_dataset(batch_size=32, num_classes=len(CLASS_NAMES)):
+    """CIFAR-10 fallback, kept as uint8 and normalized per batch
+    
+    Only the first `num_classes` CIFAR classes are kept, so the labels fit
+    the model's output layer.
+    """
+    (x_train, y_train), (x_test, y_test) = tf.keras.datasets.cifar10.load_data()
+    keep_train, keep_test = y_train[:, 0] < num_classes, y_test[:, 0] < num_classes
+    x_train, y_train = x_train[keep_train], y_train[keep_train]
+    x_test, y_test = x_test[keep_test], y_test[keep_test]
+    print(f"Training data shape: {x_train.shape}")
+    print(f"Test data shape: {x_test.shape}")
+    
+    train = tf.data.Dataset.from_tensor_slices((x_train, y_train))
+    val = tf.data.Dataset.from_tensor_slices((x_test, y_test))
+    return (_finish_pipeline(train, batch_size, training=True),
+            _finish_pipeline(val, batch_size, training=False))
 
-print(f"Training data shape: {x_train.shape}")
-print(f"Test data shape: {x_test.shape}")
+def load_datasets(data_dir=None, batch_size=32, cache_dir=None, class_names=CLASS_NAMES):
+    """Pick TFRecord shards, an image directory, or the synthetic fallback"""
+    if not data_dir:
+        return load_synthetic_dataset(batch_size, len(class_names))
+    if list(pathlib.Path(data_dir).glob('*.tfrecord*')):
+        return load_tfrecord_dataset(data_dir, batch_size, cache_dir)
+    return load_image_dataset(data_dir, batch_size, cache_dir=cache_dir,
+                              class_names=class_names)
 
 # Create a lightweight CNN model
-def create_model():
+def create_model(num_classes=len(CLASS_NAMES)):
     model = models.Sequential([
         layers.Conv2D(32, (3, 3), activation='relu', input_shape=(32, 32, 3)),
         layers.MaxPooling2D((2, 2)),
@@ -36,47 +158,177 @@ def create_model():
         layers.Flatten(),
         layers.Dense(64, activation='relu'),
         layers.Dropout(0.5),
-        layers.Dense(4, activation='softmax')  # 4 classes: plastic, paper, glass, metal
+        # Keep the softmax in float32 so mixed precision stays numerically stable
+        layers.Dense(num_classes, activation='softmax', dtype='float32')
     ])
     return model
 
-model = create_model()
-model.compile(optimizer='adam',
-              loss='sparse_categorical_crossentropy',
-              metrics=['accuracy'])
-
-model.summary()
-
-# Train the model
-history = model.fit(x_train, y_train, 
-                    epochs=10, 
-                    validation_data=(x_test, y_test),
-                    batch_size=32)
-
-# Evaluate the model
-test_loss, test_acc = model.evaluate(x_test, y_test, verbose=2)
-print(f'\nTest accuracy: {test_acc:.4f}')
-
-# Plot training history
-plt.figure(figsize=(12, 4))
-plt.subplot(1, 2, 1)
-plt.plot(history.history['accuracy'], label='Training Accuracy')
-plt.plot(history.history['val_accuracy'], label='Validation Accuracy')
-plt.title('Model Accuracy')
-plt.xlabel('Epoch')
-plt.ylabel('Accuracy')
-plt.legend()
-
-plt.subplot(1, 2, 2)
-plt.plot(history.history['loss'], label='Training Loss')
-plt.plot(history.history['val_loss'], label='Validation Loss')
-plt.title('Model Loss')
-plt.xlabel('Epoch')
-plt.ylabel('Loss')
-plt.legend()
-plt.tight_layout()
-plt.savefig('training_history.png')
-plt.show()
-
-# Save the model
-model.save('recyclable_model.h5')
+DEFAULT_CONFIG = {
+    'data_dir': None,               # image tree or TFRecord shards; None uses CIFAR-10
+    'class_names': CLASS_NAMES,     # output order; must match EdgeAIClassifier.class_names
+    'cache_dir': None,              # local dir for tf.data's decoded-image cache; None disables it
+    'epochs': 10,
+    'batch_size': 32,
+    'mixed_precision': 'auto',      # 'auto', 'bfloat16', 'float16' or 'off'
+    'checkpoint_dir': 'checkpoints',
+    'checkpoint_every': 'epoch',    # 'epoch' or a number of batches
+    'early_stopping_patience': 3,   # None disables early stopping
+    'output_path': 'recyclable_model.h5',
+    'plot_path': 'training_history.png',  # None skips plotting
+    'show_plot': False,
+}
+
+def _cpu_supports_bfloat16():
+    """Check the CPU flags for native bfloat16 (AVX512-BF16 or AMX)"""
+    try:
+        with open('/proc/cpuinfo') as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return 'avx512_bf16' in flags or 'amx_bf16' in flags
+
+def configure_mixed_precision(mode='auto'):
+    """Set the global Keras precision policy and return its name"""
+    if mode == 'auto':
+        if tf.config.list_physical_devices('GPU'):
+            mode = 'float16'
+        elif _cpu_supports_bfloat16():
+            mode = 'bfloat16'
+        else:
+            mode = 'off'
+    
+    policy = 'float32' if mode == 'off' else f'mixed_{mode}'
+    tf.keras.mixed_precision.set_global_policy(policy)
+    return policy
+
+def _has_backup(backup_dir):
+    """True if BackupAndRestore left a checkpoint, i.e. the last run was interrupted
+    
+    A successful run deletes the checkpoint files but keeps the empty directory.
+    """
+    return any(files for _, _, files in os.walk(backup_dir))
+
+def plot_history(history, plot_path='training_history.png', show=False):
+    """Plot accuracy/loss curves; headless unless `show` is set"""
+    import matplotlib
+    if not show:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
+    # Plot training history
+    plt.figure(figsize=(12, 4))
+    plt.subplot(1, 2, 1)
+    plt.plot(history['accuracy'], label='Training Accuracy')
+    plt.plot(history['val_accuracy'], label='Validation Accuracy')
+    plt.title('Model Accuracy')
+    plt.xlabel('Epoch')
+    plt.ylabel('Accuracy')
+    plt.legend()
+    
+    plt.subplot(1, 2, 2)
+    plt.plot(history['loss'], label='Training Loss')
+    plt.plot(history['val_loss'], label='Validation Loss')
+    plt.title('Model Loss')
+    plt.xlabel('Epoch')
+    plt.ylabel('Loss')
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(plot_path)
+    if show:
+        plt.show()
+    plt.close()
+
+def train(config=None):
+    """Train the classifier, resuming from the last checkpoint if one exists
+    
+    `config` overrides keys of DEFAULT_CONFIG. Returns the trained model and
+    its history dict.
+    """
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+    print("TensorFlow version:", tf.__version__)
+    print("Precision policy:", configure_mixed_precision(config['mixed_precision']))
+    
+    # Load data
+    train_ds, val_ds = load_datasets(config['data_dir'], config['batch_size'],
+                                     config['cache_dir'], config['class_names'])
+    
+    model = create_model(len(config['class_names']))
+    model.compile(optimizer='adam',
+                  loss='sparse_categorical_crossentropy',
+                  metrics=['accuracy'])
+    
+    model.summary()
+    
+    # BackupAndRestore saves model and optimizer state periodically and
+    # restarts an interrupted run from the last completed epoch
+    backup_dir = os.path.join(config['checkpoint_dir'], 'backup')
+    best_path = os.path.join(config['checkpoint_dir'], 'best.h5')
+    
+    # On resume, ModelCheckpoint would start from best=inf and overwrite
+    # best.h5 with the first resumed epoch; seed it with the pre-crash best
+    best_val_loss = None
+    if _has_backup(backup_dir) and os.path.exists(best_path):
+        best_val_loss = tf.keras.models.load_model(best_path).evaluate(val_ds, verbose=0)[0]
+        print(f"Resuming; best checkpoint val_loss: {best_val_loss:.4f}")
+    
+    callbacks = [
+        tf.keras.callbacks.BackupAndRestore(backup_dir, save_freq=config['checkpoint_every']),
+        tf.keras.callbacks.ModelCheckpoint(best_path, monitor='val_loss', save_best_only=True,
+                                           initial_value_threshold=best_val_loss),
+    ]
+    if config['early_stopping_patience'] is not None:
+        callbacks.append(tf.keras.callbacks.EarlyStopping(
+            monitor='val_loss', patience=config['early_stopping_patience'],
+            restore_best_weights=True))
+    
+    # Train the model
+    history = model.fit(train_ds, 
+                        epochs=config['epochs'], 
+                        validation_data=val_ds,
+                        callbacks=callbacks)
+    
+    # Evaluate the model
+    test_loss, test_acc = model.evaluate(val_ds, verbose=2)
+    print(f'\nTest accuracy: {test_acc:.4f}')
+    
+    if config['plot_path']:
+        plot_history(history.history, config['plot_path'], config['show_plot'])
+    
+    # Save a float32 copy: a mixed policy would be stored in every layer's
+    # config, and TFLite conversion has no bfloat16 kernels
+    if model.dtype_policy.name != 'float32':
+        tf.keras.mixed_precision.set_global_policy('float32')
+        export_model = create_model(len(config['class_names']))
+        export_model.set_weights(model.get_weights())
+    else:
+        export_model = model
+    export_model.save(config['output_path'])
+    return model, history.history
+
+def parse_args(argv=None):
+    """Build a train() config from command-line arguments"""
+    parser = argparse.ArgumentParser(description='Train the recyclable waste classifier')
+    parser.add_argument('--data-dir', default=os.environ.get('RECYCLABLE_DATA_DIR'))
+    parser.add_argument('--class-names', nargs='+', default=DEFAULT_CONFIG['class_names'],
+                        help='output class order (default: the edge classifier\'s)')
+    parser.add_argument('--cache-dir', default=os.environ.get('RECYCLABLE_CACHE_DIR'))
+    parser.add_argument('--epochs', type=int, default=DEFAULT_CONFIG['epochs'])
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_CONFIG['batch_size'])
+    parser.add_argument('--mixed-precision', default=DEFAULT_CONFIG['mixed_precision'],
+                        choices=['auto', 'bfloat16', 'float16', 'off'])
+    parser.add_argument('--checkpoint-dir', default=DEFAULT_CONFIG['checkpoint_dir'])
+    parser.add_argument('--checkpoint-every', default=DEFAULT_CONFIG['checkpoint_every'],
+                        type=lambda value: value if value == 'epoch' else int(value),
+                        help="'epoch' or a number of batches")
+    parser.add_argument('--patience', dest='early_stopping_patience', type=int,
+                        default=DEFAULT_CONFIG['early_stopping_patience'])
+    parser.add_argument('--no-early-stopping', dest='early_stopping_patience',
+                        action='store_const', const=None)
+    parser.add_argument('--output-path', default=DEFAULT_CONFIG['output_path'])
+    parser.add_argument('--plot-path', default=DEFAULT_CONFIG['plot_path'])
+    parser.add_argument('--no-plot', dest='plot_path', action='store_const', const=None)
+    parser.add_argument('--show-plot', action='store_true')
+    return vars(parser.parse_args(argv))
+
+if __name__ == "__main__":
+    train(parse_args())
@@ -0,0 +1,165 @@
+# Content-hash result cache for the edge classifier
+import collections
+import hashlib
+import json
+import os
+import threading
+import time
+
+def content_hash(data):
+    """Fast hash of raw bytes (file contents or a tensor buffer)"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def file_hash(path, chunk_size=1 << 20):
+    """Content hash of a file, read in chunks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ResultCache:
+    # The disk tier is pruned once every this many puts
+    PRUNE_EVERY = 64
+    
+    def __init__(self, max_size=1024, ttl=None, cache_dir=None, max_disk_entries=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries or 10 * max_size
+        self._puts = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        
+        # key -> (stored_at, result), least recently used first
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+    
+    def make_key(self, model_hash, data, meta=None):
+        """Key a result on the model, the input content and optional metadata
+        
+        `meta` (e.g. an array's dtype and shape) separates inputs whose raw
+        bytes happen to be identical.
+        """
+        digest = hashlib.blake2b(data, digest_size=16)
+        if meta is not None:
+            digest.update(repr(meta).encode())
+        return f"{model_hash}-{digest.hexdigest()}"
+    
+    def _expired(self, stored_at):
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+    
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, key):
+        """Return the cached result for `key`, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[0]):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+        
+        # Fall back to the persistent tier and promote what we find
+        if self.cache_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path) as f:
+                    stored_at, result = json.load(f)
+            except (OSError, ValueError):
+                pass
+            else:
+                if not self._expired(stored_at):
+                    self._store(key, stored_at, result)
+                    with self._lock:
+                        self.hits += 1
+                        self.disk_hits += 1
+                    return result
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        
+        with self._lock:
+            self.misses += 1
+        return None
+    
+    def _store(self, key, stored_at, result):
+        with self._lock:
+            self._entries[key] = (stored_at, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def put(self, key, result):
+        """Cache a classification result"""
+        stored_at = time.time()
+        self._store(key, stored_at, result)
+        
+        if self.cache_dir:
+            # Write then rename so readers never see a partial file
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump([stored_at, result], f)
+            os.replace(tmp_path, path)
+            
+            with self._lock:
+                self._puts += 1
+                prune = self._puts % self.PRUNE_EVERY == 0
+            if prune:
+                self.prune_disk()
+    
+    def prune_disk(self):
+        """Delete expired disk entries, then the oldest beyond max_disk_entries"""
+        if not self.cache_dir:
+            return 0
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                continue
+        entries.sort()
+        
+        # Files are written once per put, so mtime is the time they were stored
+        excess = len(entries) - self.max_disk_entries
+        removed = 0
+        for i, (stored_at, path) in enumerate(entries):
+            if i >= excess and not self._expired(stored_at):
+                continue
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+    
+    def clear(self):
+        """Drop every in-memory entry (the persistent tier is keyed by model and kept)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,329 @@
+# Streaming classification: decode -> preprocess -> batch -> infer -> emit
+import argparse
+import collections
+import glob
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from edge_ai_classifier import EdgeAIClassifier
+from fast_preprocessing import PreprocessingEngine
+
+# Marks the end of the stream as it passes through each stage
+_END = object()
+
+DROP_POLICIES = ('block', 'drop_oldest', 'drop_newest')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+def glob_source(pattern):
+    """Yield (frame_id, path) for every file matching a glob pattern"""
+    for path in sorted(glob.glob(pattern)):
+        yield path, path
+
+def directory_source(directory, poll_interval=0.5, stop_event=None):
+    """Watch a directory and yield (frame_id, path) for each new image file
+    
+    A file is yielded once its size and mtime are unchanged across two polls,
+    i.e. it is no longer being written. Files are tracked by name rather than
+    by mtime, so files moved in with an old mtime (mv, cp -p, skewed camera
+    clocks) are not missed; names that leave the directory are forgotten, so
+    memory is bounded by the directory's contents.
+    """
+    yielded = set()
+    previous = {}
+    while stop_event is None or not stop_event.is_set():
+        present = set()
+        candidates = []
+        for entry in os.scandir(directory):
+            if not entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            present.add(entry.name)
+            if entry.name in yielded:
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            candidates.append((stat.st_mtime_ns, entry.name, stat.st_size, entry.path))
+        yielded &= present
+        candidates.sort()
+        
+        current = {}
+        for mtime, name, size, path in candidates:
+            if previous.get(name) == (mtime, size):
+                yielded.add(name)
+                yield path, path
+            else:
+                current[name] = (mtime, size)
+        previous = current
+        time.sleep(poll_interval)
+
+def video_source(video_path, skip_frames=0):
+    """Yield (frame_id, RGB array) for every (skip_frames + 1)-th video frame"""
+    try:
+        import cv2
+    except ImportError:
+        raise ImportError("Video input requires OpenCV: pip install opencv-python")
+    
+    capture = cv2.VideoCapture(video_path)
+    frame_index = 0
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            if frame_index % (skip_frames + 1) == 0:
+                yield f"{video_path}#{frame_index}", cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            frame_index += 1
+    finally:
+        capture.release()
+
+def _put(q, item, stop_event, poll_interval=0.1):
+    """Put with a timeout loop, giving up once the run is stopped"""
+    while not stop_event.is_set():
+        try:
+            q.put(item, timeout=poll_interval)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _get(q, stop_event, poll_interval=0.1):
+    """Get with a timeout loop, returning _END once the run is stopped"""
+    while not stop_event.is_set():
+        try:
+            return q.get(timeout=poll_interval)
+        except queue.Empty:
+            pass
+    return _END
+
+class StageStats:
+    def __init__(self, window=1000):
+        self.latencies = collections.deque(maxlen=window)
+        self.depths = collections.deque(maxlen=window)
+        self.processed = 0
+        self.dropped = 0
+        # Stage threads record while the consumer reads summaries
+        self._lock = threading.Lock()
+    
+    def record(self, latency, depth):
+        with self._lock:
+            self.latencies.append(latency)
+            self.depths.append(depth)
+            self.processed += 1
+    
+    def summary(self):
+        """Latency percentiles (ms) and queue depth for this stage"""
+        with self._lock:
+            latencies = np.array(self.latencies)
+            depths = list(self.depths)
+            summary = {'processed': self.processed, 'dropped': self.dropped}
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies * 1000, [50, 95, 99])
+            summary.update({
+                'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99),
+                'queue_depth': depths[-1],
+                'max_queue_depth': max(depths),
+            })
+        return summary
+
+class StreamingClassifier:
+    def __init__(self, classifier, batch_size=8, queue_size=32, drop_policy='block',
+                 batch_timeout=0.05):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy {drop_policy!r}, expected one of {DROP_POLICIES}")
+        
+        self.classifier = classifier
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.batch_timeout = batch_timeout
+        
+        _, height, width, _ = classifier.input_details[0]['shape']
+        self.engine = PreprocessingEngine(target_size=(width, height))
+        self.stats = {name: StageStats() for name in ('decode', 'preprocess', 'infer', 'end_to_end')}
+    
+    def _offer(self, frames, item, stop_event):
+        """Queue a source frame, applying the drop policy when the pipeline is behind"""
+        if self.drop_policy == 'block':
+            _put(frames, item, stop_event)
+            return
+        try:
+            frames.put_nowait(item)
+        except queue.Full:
+            self.stats['decode'].dropped += 1
+            if self.drop_policy == 'drop_oldest':
+                try:
+                    frames.get_nowait()
+                except queue.Empty:
+                    pass
+                _put(frames, item, stop_event)
+    
+    def _produce(self, source, frames, stop_event):
+        try:
+            for frame_id, item in source:
+                if stop_event.is_set():
+                    break
+                self._offer(frames, (frame_id, item, time.perf_counter()), stop_event)
+        finally:
+            # Downstream stages always see the end, even if the source fails
+            _put(frames, _END, stop_event)
+    
+    def _stage(self, name, fn, inbox, outbox, stop_event):
+        """Apply `fn` to every item of `inbox`, blocking on a full `outbox`"""
+        stats = self.stats[name]
+        try:
+            while True:
+                item = _get(inbox, stop_event)
+                if item is _END:
+                    return
+                frame_id, payload, arrived = item
+                start_time = time.perf_counter()
+                try:
+                    payload = fn(payload)
+                except Exception as error:
+                    # One bad frame (e.g. a decompression bomb) becomes an error result
+                    payload = error
+                stats.record(time.perf_counter() - start_time, inbox.qsize())
+                _put(outbox, (frame_id, payload, arrived), stop_event)
+        finally:
+            _put(outbox, _END, stop_event)
+    
+    def _decode(self, item):
+        """Decode a path or raw frame to an RGB image at the model input size"""
+        if isinstance(item, Exception):
+            return item
+        if isinstance(item, np.ndarray):
+            return Image.fromarray(item).resize(self.engine.target_size)
+        return self.engine.decode(item)
+    
+    def _preprocess(self, image):
+        if isinstance(image, Exception):
+            return image
+        return np.asarray(image, dtype=np.float32) / 255.0
+    
+    def _infer(self, inbox, outbox, stop_event):
+        """Group preprocessed frames into batches and classify each batch"""
+        stats = self.stats['infer']
+        finished = False
+        try:
+            while not finished:
+                batch = []
+                item = _get(inbox, stop_event)
+                deadline = time.perf_counter() + self.batch_timeout
+                while item is not _END:
+                    batch.append(item)
+                    remaining = deadline - time.perf_counter()
+                    if len(batch) >= self.batch_size or remaining <= 0:
+                        break
+                    try:
+                        item = inbox.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                finished = item is _END
+                
+                ready = [entry for entry in batch if isinstance(entry[1], np.ndarray)]
+                results = iter(())
+                if ready:
+                    start_time = time.perf_counter()
+                    try:
+                        results = iter(self.classifier.classify_batch(
+                            [entry[1] for entry in ready], batch_size=self.batch_size))
+                    except Exception as error:
+                        # A failed batch fails its frames, not the pipeline
+                        results = iter([{'error': str(error)}] * len(ready))
+                    stats.record(time.perf_counter() - start_time, inbox.qsize())
+                
+                for frame_id, payload, arrived in batch:
+                    if isinstance(payload, np.ndarray):
+                        _put(outbox, (frame_id, next(results), arrived), stop_event)
+                    else:
+                        _put(outbox, (frame_id, {'error': str(payload)}, arrived), stop_event)
+        finally:
+            _put(outbox, _END, stop_event)
+    
+    def run(self, source):
+        """Classify a stream of (frame_id, path or frame) items, yielding results
+        
+        Every stage runs in its own thread and stages are joined by bounded
+        queues, so a slow consumer backs the pipeline up to the source instead
+        of growing memory.
+        """
+        frames, decoded, preprocessed, results = (
+            queue.Queue(maxsize=self.queue_size) for _ in range(4))
+        stop_event = threading.Event()
+        
+        threads = [
+            threading.Thread(target=self._produce, args=(source, frames, stop_event)),
+            threading.Thread(target=self._stage,
+                             args=('decode', self._decode, frames, decoded, stop_event)),
+            threading.Thread(target=self._stage,
+                             args=('preprocess', self._preprocess, decoded, preprocessed,
+                                   stop_event)),
+            threading.Thread(target=self._infer, args=(preprocessed, results, stop_event)),
+        ]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        
+        end_to_end = self.stats['end_to_end']
+        try:
+            while True:
+                item = results.get()
+                if item is _END:
+                    break
+                frame_id, result, arrived = item
+                end_to_end.record(time.perf_counter() - arrived, results.qsize())
+                yield frame_id, result
+        finally:
+            # Every queue operation polls stop_event, so stages blocked on a full
+            # or empty queue exit even when the consumer abandons the stream
+            stop_event.set()
+            for thread in threads[1:]:
+                thread.join()
+    
+    def report(self):
+        """Per-stage queue depth and latency percentiles"""
+        return {name: stats.summary() for name, stats in self.stats.items()}
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Stream frames through the edge classifier')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--watch', help='directory to watch for new images')
+    group.add_argument('--glob', help='glob pattern of images to classify')
+    group.add_argument('--video', help='video file to classify frame by frame')
+    parser.add_argument('--model', default='recyclable_model.tflite')
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--queue-size', type=int, default=32)
+    parser.add_argument('--drop-policy', choices=DROP_POLICIES, default='block')
+    parser.add_argument('--skip-frames', type=int, default=0)
+    parser.add_argument('--report-every', type=int, default=100)
+    args = parser.parse_args()
+    
+    if args.watch:
+        source = directory_source(args.watch)
+    elif args.glob:
+        source = glob_source(args.glob)
+    else:
+        source = video_source(args.video, skip_frames=args.skip_frames)
+    
+    stream = StreamingClassifier(EdgeAIClassifier(args.model),
+                                 batch_size=args.batch_size,
+                                 queue_size=args.queue_size,
+                                 drop_policy=args.drop_policy)
+    try:
+        for count, (frame_id, result) in enumerate(stream.run(source), 1):
+            if 'error' in result:
+                print(f"{frame_id}: {result['error']}")
+            else:
+                print(f"{frame_id}: {result['class']} ({result['confidence']:.4f})")
+            if count % args.report_every == 0:
+                print("Pipeline stats:", stream.report())
+    except KeyboardInterrupt:
+        pass
+    print("Pipeline stats:", stream.report())
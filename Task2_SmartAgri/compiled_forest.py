@@ -0,0 +1,124 @@
+# Array-backed tree ensemble for sklearn-free crop yield scoring
+import json
+import os
+
+import numpy as np
+
+# Node tables written one .npy file each by save_tables()
+TABLES = ('feature', 'threshold', 'left', 'right', 'value', 'roots', 'is_leaf')
+
+def atomic_write(path, write, mode='wb'):
+    """Call write(f) on a temp file, then rename it over `path`
+    
+    Never truncates the existing file, so processes that have it
+    memory-mapped keep reading the old contents.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, mode) as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+class CompiledForest:
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth,
+                 is_leaf=None):
+        # One flat node table for all trees; node i of tree t lives at roots[t] + i
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.is_leaf = left == np.arange(len(left)) if is_leaf is None else is_leaf
+    
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Flatten a fitted RandomForestRegressor into contiguous node arrays"""
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+            
+            # Leaves point at themselves, so extra traversal steps are no-ops
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+            
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+        
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.intp),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.array(roots, dtype=np.intp),
+            max_depth=max_depth,
+        )
+    
+    @property
+    def n_trees(self):
+        return len(self.roots)
+    
+    def _traverse(self, X):
+        """Walk every (row, tree) pair down to its leaf, one level per step"""
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            if self.is_leaf[nodes].all():
+                break
+            # Same comparison as sklearn: float32 feature value <= float64 threshold
+            go_left = np.take_along_axis(X, self.feature[nodes], axis=1) <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+    
+    def predict(self, X, chunk_size=4096):
+        """Predict for a 2-D array of readings (columns in training order)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        
+        prediction = np.empty(len(X), dtype=np.float64)
+        # Chunking bounds the (rows x trees) node-index matrix
+        for start in range(0, len(X), chunk_size):
+            leaves = self._traverse(X[start:start + chunk_size])
+            prediction[start:start + chunk_size] = self.value[leaves].mean(axis=1)
+        return prediction
+    
+    def predict_one(self, reading):
+        """Predict one sensor reading"""
+        return float(self.predict(reading)[0])
+    
+    def save_tables(self, directory):
+        """Write each node table to its own .npy file so load_tables() can memory-map it
+        
+        Files are replaced by rename, so re-saving over a directory that
+        scoring processes have mapped is safe.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in TABLES:
+            table = getattr(self, name)
+            atomic_write(os.path.join(directory, f'{name}.npy'),
+                         lambda f: np.save(f, table))
+        atomic_write(os.path.join(directory, 'forest.json'),
+                     lambda f: json.dump({'max_depth': int(self.max_depth)}, f), mode='w')
+    
+    @classmethod
+    def load_tables(cls, directory, mmap_mode='r'):
+        """Load tables written by save_tables()
+        
+        With mmap_mode='r' the arrays are read-only memory maps, so every
+        process scoring from the same directory shares one copy of the forest
+        in the page cache.
+        """
+        with open(os.path.join(directory, 'forest.json')) as f:
+            max_depth = json.load(f)['max_depth']
+        tables = {name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+                  for name in TABLES}
+        return cls(max_depth=max_depth, **tables)
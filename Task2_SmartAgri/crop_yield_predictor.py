@@ -1,16 +1,43 @@
 # Smart Agriculture - Crop Yield Prediction Model
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
 import numpy as np
 import pandas as pd
+import sklearn
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, r2_score
-import matplotlib.pyplot as plt
+
+from compiled_forest import CompiledForest, atomic_write
+
+# Bump when the saved artifact layout changes
+ARTIFACT_VERSION = 2
 
 class SmartAgriculturePredictor:
-    def __init__(self):
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
+    def __init__(self, n_estimators=100, n_jobs=-1, max_trees=None, random_state=42,
+                 **forest_params):
+        # forest_params (max_depth, min_samples_leaf, ...) are passed through,
+        # e.g. from hyperparameter_search. n_jobs applies to fitting only: the
+        # estimator keeps n_jobs=1 so single-reading predicts skip joblib dispatch
+        self.n_jobs = n_jobs
+        self.model = RandomForestRegressor(n_estimators=n_estimators, n_jobs=1,
+                                           random_state=random_state, **forest_params)
         self.is_trained = False
         
+        # Sliding-window size for update_model; older trees are retired beyond it
+        self.max_trees = max_trees
+        self.random_state = random_state
+        self.update_rounds = 0
+        self.training_stats = {}
+        
+        # Memory-mapped node tables, set by load(..., scoring_only=True)
+        self.compiled = None
+        
     def generate_sample_data(self, n_samples=1000):
         """Generate synthetic agricultural data for demonstration"""
         np.random.seed(42)
@@ -47,13 +74,38 @@ class SmartAgriculturePredictor:
             X, y, test_size=0.2, random_state=42
         )
         
-        self.model.fit(X_train, y_train)
+        return self._fit(X_train, y_train, X_test, y_test, list(X.columns))
+    
+    def train_from_arrays(self, X, y, feature_names, holdout_fraction=0.2):
+        """Train on 2-D feature and 1-D target arrays, e.g. memory-mapped columns
+        
+        The last `holdout_fraction` of rows is held out for evaluation. Both
+        parts are slices, so memory-mapped float32 inputs are never copied.
+        """
+        n_train = len(X) - int(len(X) * holdout_fraction)
+        return self._fit(X[:n_train], y[:n_train], X[n_train:], y[n_train:],
+                         list(feature_names))
+    
+    def _fit_forest(self, X, y):
+        """Fit on n_jobs cores, then drop back to n_jobs=1 for prediction"""
+        self.model.set_params(n_jobs=self.n_jobs)
+        try:
+            self.model.fit(X, y)
+        finally:
+            self.model.set_params(n_jobs=1)
+    
+    def _fit(self, X_train, y_train, X_test, y_test, feature_names):
+        self.model.set_params(warm_start=False)
+        self._fit_forest(X_train, y_train)
         self.is_trained = True
+        self.feature_names = feature_names
+        self.update_rounds = 0
         
         # Evaluate model
-        y_pred = self.model.predict(X_test)
-        mae = mean_absolute_error(y_test, y_pred)
-        r2 = r2_score(y_test, y_pred)
+        mae, r2 = self._evaluate(X_test, y_test)
+        self.training_stats = {'mae': float(mae), 'r2': float(r2),
+                               'n_train': len(X_train), 'n_test': len(X_test),
+                               'trained_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
         
         print(f"Model Training Complete!")
         print(f"Mean Absolute Error: {mae:.2f}")
@@ -61,7 +113,7 @@ class SmartAgriculturePredictor:
         
         # Feature importance
         feature_importance = pd.DataFrame({
-            'feature': X.columns,
+            'feature': feature_names,
             'importance': self.model.feature_importances_
         }).sort_values('importance', ascending=False)
         
@@ -70,35 +122,211 @@ class SmartAgriculturePredictor:
         
         return mae, r2
     
+    def _evaluate(self, X_test, y_test):
+        y_pred = self.model.predict(X_test)
+        return mean_absolute_error(y_test, y_pred), r2_score(y_test, y_pred)
+    
+    def update_model(self, df, n_new_trees=20):
+        """Grow new trees on fresh data only, retiring the oldest past max_trees
+        
+        Uses warm_start so the existing trees are kept as-is and only the new
+        ones are fitted, giving a sliding-window forest over recent readings.
+        """
+        if not self.is_trained or self.model is None:
+            raise ValueError("Model must be trained (not loaded scoring-only) before it can be updated")
+        
+        X = df[self.feature_names]
+        y = df['crop_yield']
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42
+        )
+        
+        # A fresh seed per round keeps new trees from reusing retired trees' seeds
+        self.update_rounds += 1
+        self.model.set_params(
+            warm_start=True,
+            n_estimators=len(self.model.estimators_) + n_new_trees,
+            random_state=self.random_state + self.update_rounds,
+        )
+        self._fit_forest(X_train, y_train)
+        
+        retired = 0
+        if self.max_trees is not None and len(self.model.estimators_) > self.max_trees:
+            retired = len(self.model.estimators_) - self.max_trees
+            self.model.estimators_ = self.model.estimators_[retired:]
+            self.model.set_params(n_estimators=len(self.model.estimators_))
+        
+        mae, r2 = self._evaluate(X_test, y_test)
+        print(f"Model Update Complete! +{n_new_trees} trees, -{retired} retired, "
+              f"{len(self.model.estimators_)} total")
+        print(f"Mean Absolute Error on new data: {mae:.2f}")
+        print(f"R² Score on new data: {r2:.4f}")
+        
+        return mae, r2
+    
     def predict_yield(self, sensor_data):
         """Predict crop yield based on sensor data"""
         if not self.is_trained:
             raise ValueError("Model must be trained before making predictions")
         
+        if self.model is None:
+            return self.compiled.predict_one(np.asarray(sensor_data, dtype=np.float32))
         prediction = self.model.predict([sensor_data])[0]
         return prediction
     
-    def plot_feature_importance(self):
-        """Plot feature importance"""
+    def _validate_features(self, X):
+        """Return X as a C-contiguous float32 array in training column order"""
+        if isinstance(X, pd.DataFrame):
+            missing = [name for name in self.feature_names if name not in X.columns]
+            if missing:
+                raise ValueError(f"Missing sensor columns: {missing}")
+            X = X[self.feature_names].to_numpy()
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(f"Expected a 2-D array with {len(self.feature_names)} columns "
+                             f"({', '.join(self.feature_names)}), got shape {X.shape}")
+        return X
+    
+    def _predict_chunk(self, X):
+        """Average the trees' predictions for an already validated float32 chunk"""
+        prediction = np.zeros(len(X), dtype=np.float64)
+        for tree in self.model.estimators_:
+            prediction += tree.predict(X, check_input=False)
+        prediction /= len(self.model.estimators_)
+        return prediction
+    
+    def predict_yield_batch(self, X, chunk_size=10000, n_jobs=None):
+        """Predict crop yield for many readings at once
+        
+        X is a 2-D array (columns in training order) or a DataFrame with the
+        training columns. Input is validated once and then scored in chunks of
+        `chunk_size` rows, in parallel threads when there is more than one chunk.
+        """
+        if not self.is_trained:
+            raise ValueError("Model must be trained before making predictions")
+        
+        X = self._validate_features(X)
+        if self.model is None:
+            return self.compiled.predict(X)
+        chunks = [X[start:start + chunk_size] for start in range(0, len(X), chunk_size)]
+        if len(chunks) <= 1:
+            return self._predict_chunk(X)
+        
+        n_jobs = n_jobs or self.n_jobs or 1
+        if n_jobs < 0:
+            n_jobs = os.cpu_count() or 1
+        # Tree traversal releases the GIL, so threads scale without copying X
+        with ThreadPoolExecutor(max_workers=min(n_jobs, len(chunks))) as executor:
+            return np.concatenate(list(executor.map(self._predict_chunk, chunks)))
+    
+    def compile_model(self):
+        """Export the trained forest to array-backed node tables
+        
+        The returned CompiledForest predicts without sklearn, for low-latency
+        scoring of single live readings.
+        """
         if not self.is_trained:
-            raise ValueError("Model must be trained first")
+            raise ValueError("Model must be trained before it can be compiled")
+        if self.model is None:
+            return self.compiled
+        return CompiledForest.from_sklearn(self.model)
+    
+    def save(self, path):
+        """Save the trained forest and versioned metadata to directory `path`
+        
+        Besides the pickled forest, the compiled node tables are written as
+        separate .npy files under compiled/ for memory-mapped scoring. Every
+        file is replaced by rename, metadata.json last, so saving over a live
+        artifact never truncates a file another process has mapped or is reading.
+        """
+        if not self.is_trained or self.model is None:
+            raise ValueError("Model must be trained (not loaded scoring-only) before it can be saved")
+        
+        os.makedirs(path, exist_ok=True)
+        atomic_write(os.path.join(path, 'model.joblib'), lambda f: joblib.dump(self.model, f))
+        self.compile_model().save_tables(os.path.join(path, 'compiled'))
+        
+        metadata = {
+            'artifact_version': ARTIFACT_VERSION,
+            'sklearn_version': sklearn.__version__,
+            'feature_names': self.feature_names,
+            'training_stats': self.training_stats,
+            'n_estimators': len(self.model.estimators_),
+            'max_trees': self.max_trees,
+            'random_state': self.random_state,
+            'update_rounds': self.update_rounds,
+        }
+        atomic_write(os.path.join(path, 'metadata.json'),
+                     lambda f: json.dump(metadata, f, indent=2), mode='w')
+    
+    @classmethod
+    def load(cls, path, scoring_only=False, mmap_mode='r'):
+        """Load a predictor written by save()
+        
+        By default the sklearn forest is unpickled; its trees copy their node
+        arrays into private buffers, so every process holds its own copy.
+        With scoring_only=True only the compiled node tables are loaded, as
+        read-only memory maps (mmap_mode) that worker processes share in the
+        page cache. Such a predictor can predict but not be updated or saved.
+        """
+        with open(os.path.join(path, 'metadata.json')) as f:
+            metadata = json.load(f)
+        
+        if metadata['artifact_version'] != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported artifact version {metadata['artifact_version']}, "
+                             f"expected {ARTIFACT_VERSION}")
+        if metadata['sklearn_version'] != sklearn.__version__:
+            warnings.warn(f"Model was saved with scikit-learn {metadata['sklearn_version']} "
+                          f"but {sklearn.__version__} is installed")
+        
+        predictor = cls(max_trees=metadata['max_trees'], random_state=metadata['random_state'])
+        if scoring_only:
+            predictor.model = None
+            predictor.compiled = CompiledForest.load_tables(os.path.join(path, 'compiled'),
+                                                            mmap_mode=mmap_mode)
+        else:
+            predictor.model = joblib.load(os.path.join(path, 'model.joblib'))
+            predictor.model.set_params(n_jobs=1)
+        predictor.feature_names = metadata['feature_names']
+        predictor.training_stats = metadata['training_stats']
+        predictor.update_rounds = metadata['update_rounds']
+        predictor.is_trained = True
+        return predictor
+    
+    def plot_feature_importance(self, output_path='feature_importance.png', show=True,
+                                dpi=100, fmt=None):
+        """Plot feature importance; show=False renders headless without blocking"""
+        if not self.is_trained or self.model is None:
+            raise ValueError("Model must be trained (not loaded scoring-only) first")
         
         importance = self.model.feature_importances_
         features = ['Soil Moisture', 'Temperature', 'Humidity', 
                    'Nitrogen', 'Phosphorus', 'Potassium', 'pH Level']
         
-        plt.figure(figsize=(10, 6))
-        plt.barh(features, importance)
-        plt.xlabel('Feature Importance')
-        plt.title('Crop Yield Prediction - Feature Importance')
-        plt.tight_layout()
-        plt.savefig('feature_importance.png')
-        plt.show()
+        # Imported here so scoring-only services never load matplotlib
+        if show:
+            import matplotlib.pyplot as plt
+            fig = plt.figure(figsize=(10, 6))
+        else:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+            fig = Figure(figsize=(10, 6))
+            FigureCanvasAgg(fig)
+        
+        ax = fig.add_subplot(1, 1, 1)
+        ax.barh(features, importance)
+        ax.set_xlabel('Feature Importance')
+        ax.set_title('Crop Yield Prediction - Feature Importance')
+        fig.tight_layout()
+        fig.savefig(output_path, dpi=dpi, format=fmt)
+        if show:
+            plt.show()
+        return output_path
 
 # Example usage
 if __name__ == "__main__":
-    # Initialize predictor
-    predictor = SmartAgriculturePredictor()
+    # Initialize predictor (parallel fitting, 150-tree sliding window for updates)
+    predictor = SmartAgriculturePredictor(max_trees=150)
     
     # Generate and train on sample data
     df = predictor.generate_sample_data()
@@ -109,5 +337,19 @@ if __name__ == "__main__":
     predicted_yield = predictor.predict_yield(sample_sensor_data)
     print(f"\nPredicted Crop Yield: {predicted_yield:.2f} kg/ha")
     
+    # Score a whole field's readings in one call
+    field_readings = df.drop('crop_yield', axis=1)
+    field_yields = predictor.predict_yield_batch(field_readings)
+    print(f"Mean predicted yield over {len(field_yields)} readings: {field_yields.mean():.2f} kg/ha")
+    
+    # Nightly update: grow trees on the new readings only
+    new_readings = predictor.generate_sample_data(n_samples=500)
+    predictor.update_model(new_readings, n_new_trees=25)
+    
+    # Persist the model so services can start without retraining
+    predictor.save('crop_yield_model')
+    restored = SmartAgriculturePredictor.load('crop_yield_model')
+    print(f"Restored model prediction: {restored.predict_yield(sample_sensor_data):.2f} kg/ha")
+    
     # Plot feature importance
     predictor.plot_feature_importance()
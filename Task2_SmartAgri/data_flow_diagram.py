@@ -1,125 +1,173 @@
 # Data Flow Diagram Generator for Smart Agriculture System
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection, PatchCollection, PolyCollection
+from matplotlib.figure import Figure
 import matplotlib.patches as patches
 
-def create_data_flow_diagram():
-    fig, ax = plt.subplots(1, 1, figsize=(15, 8))
-    
-    # Colors
-    sensor_color = '#4CAF50'  # Green
-    gateway_color = '#2196F3'  # Blue
-    cloud_color = '#FF9800'    # Orange
-    ai_color = '#9C27B0'       # Purple
-    user_color = '#F44336'     # Red
-    
-    # Positions
-    positions = {
-        'sensors': [(2, 6), (2, 5), (2, 4), (2, 3)],
-        'gateway': (5, 4.5),
-        'edge_ai': (8, 4.5),
-        'cloud': (11, 6),
-        'ai_model': (11, 3),
-        'farmer': (14, 4.5)
-    }
-    
-    # Create elements
-    # Sensors
-    sensor_names = ['Soil Moisture', 'Temperature', 'NPK Sensor', 'Camera']
-    for i, (x, y) in enumerate(positions['sensors']):
-        ax.add_patch(patches.Rectangle((x, y), 1.5, 0.8, 
-                                     facecolor=sensor_color, 
-                                     edgecolor='black',
-                                     alpha=0.7))
-        ax.text(x + 0.75, y + 0.4, sensor_names[i], 
-               ha='center', va='center', fontweight='bold')
-    
-    # Gateway
-    ax.add_patch(patches.Rectangle(positions['gateway'], 2, 1.5,
-                                 facecolor=gateway_color,
-                                 edgecolor='black',
-                                 alpha=0.7))
-    ax.text(positions['gateway'][0] + 1, positions['gateway'][1] + 0.75,
-           'IoT Gateway', ha='center', va='center', fontweight='bold')
-    
-    # Edge AI
-    ax.add_patch(patches.Rectangle(positions['edge_ai'], 2, 1.5,
-                                 facecolor=ai_color,
-                                 edgecolor='black',
-                                 alpha=0.7))
-    ax.text(positions['edge_ai'][0] + 1, positions['edge_ai'][1] + 0.75,
-           'Edge AI\n(Immediate Control)', ha='center', va='center', 
-           fontweight='bold', fontsize=9)
-    
-    # Cloud
-    ax.add_patch(patches.Rectangle(positions['cloud'], 2, 1.5,
-                                 facecolor=cloud_color,
-                                 edgecolor='black',
-                                 alpha=0.7))
-    ax.text(positions['cloud'][0] + 1, positions['cloud'][1] + 0.75,
-           'Cloud Platform', ha='center', va='center', fontweight='bold')
-    
-    # AI Model
-    ax.add_patch(patches.Rectangle(positions['ai_model'], 2, 1.5,
-                                 facecolor=ai_color,
-                                 edgecolor='black',
-                                 alpha=0.7))
-    ax.text(positions['ai_model'][0] + 1, positions['ai_model'][1] + 0.75,
-           'LSTM Model\n(Yield Prediction)', ha='center', va='center', 
-           fontweight='bold', fontsize=9)
-    
-    # Farmer
-    ax.add_patch(patches.Rectangle(positions['farmer'], 2, 1.5,
-                                 facecolor=user_color,
-                                 edgecolor='black',
-                                 alpha=0.7))
-    ax.text(positions['farmer'][0] + 1, positions['farmer'][1] + 0.75,
-           'Farmer\nDashboard', ha='center', va='center', fontweight='bold')
-    
-    # Draw arrows
-    arrows = [
+# Colors
+sensor_color = '#4CAF50'  # Green
+gateway_color = '#2196F3'  # Blue
+cloud_color = '#FF9800'    # Orange
+ai_color = '#9C27B0'       # Purple
+user_color = '#F44336'     # Red
+
+# Declarative diagram: nodes are boxes, edges are labelled arrows between node ids
+DEFAULT_SPEC = {
+    'title': 'Smart Agriculture System - Data Flow Diagram',
+    'xlim': (0, 16),
+    'ylim': (0, 8),
+    'nodes': [
+        {'id': 'soil', 'label': 'Soil Moisture', 'xy': (2, 6), 'size': (1.5, 0.8), 'color': sensor_color},
+        {'id': 'temperature', 'label': 'Temperature', 'xy': (2, 5), 'size': (1.5, 0.8), 'color': sensor_color},
+        {'id': 'npk', 'label': 'NPK Sensor', 'xy': (2, 4), 'size': (1.5, 0.8), 'color': sensor_color},
+        {'id': 'camera', 'label': 'Camera', 'xy': (2, 3), 'size': (1.5, 0.8), 'color': sensor_color},
+        {'id': 'gateway', 'label': 'IoT Gateway', 'xy': (5, 4.5), 'color': gateway_color},
+        {'id': 'edge_ai', 'label': 'Edge AI\n(Immediate Control)', 'xy': (8, 4.5), 'color': ai_color, 'fontsize': 9},
+        {'id': 'cloud', 'label': 'Cloud Platform', 'xy': (11, 6), 'color': cloud_color},
+        {'id': 'ai_model', 'label': 'LSTM Model\n(Yield Prediction)', 'xy': (11, 3), 'color': ai_color, 'fontsize': 9},
+        {'id': 'farmer', 'label': 'Farmer\nDashboard', 'xy': (14, 4.5), 'color': user_color},
+    ],
+    'edges': [
         # Sensors to Gateway
-        ((3.5, 6.4), (5, 5.5), 'Sensor Data'),
-        ((3.5, 5.4), (5, 5.2), ''),
-        ((3.5, 4.4), (5, 4.9), ''),
-        ((3.5, 3.4), (5, 4.6), ''),
-        
+        {'source': 'soil', 'target': 'gateway', 'label': 'Sensor Data'},
+        {'source': 'temperature', 'target': 'gateway'},
+        {'source': 'npk', 'target': 'gateway'},
+        {'source': 'camera', 'target': 'gateway'},
         # Gateway to Edge AI
-        ((7, 5.25), (8, 5.25), 'Processed Data'),
-        
+        {'source': 'gateway', 'target': 'edge_ai', 'label': 'Processed Data'},
         # Edge AI to Cloud
-        ((10, 5.25), (11, 6.5), 'Aggregated Data'),
-        
+        {'source': 'edge_ai', 'target': 'cloud', 'label': 'Aggregated Data'},
         # Cloud to AI Model
-        ((11, 4.5), (11, 4.5), 'Stored Data'),
-        
+        {'source': 'cloud', 'target': 'ai_model', 'label': 'Stored Data'},
         # AI Model to Farmer
-        ((13, 3.75), (14, 4.5), 'Predictions & Insights'),
-        
+        {'source': 'ai_model', 'target': 'farmer', 'label': 'Predictions & Insights'},
         # Farmer to Gateway (control signals)
-        ((14, 3.75), (7, 3.75), 'Control Commands', 'red')
-    ]
+        {'source': 'farmer', 'target': 'gateway', 'offset': (0, -1.5),
+         'label': 'Control Commands', 'color': 'red'},
+    ],
+}
+
+DEFAULT_NODE_SIZE = (2, 1.5)
+
+def _node_box(node):
+    width, height = node.get('size', DEFAULT_NODE_SIZE)
+    return node['xy'][0], node['xy'][1], width, height
+
+def _edge_points(edge, boxes):
+    """Resolve an edge to start/end points, from coordinates or node ids"""
+    if 'start' in edge:
+        return edge['start'], edge['end']
+    # Node ids: join the facing sides of the two boxes
+    sx, sy, sw, sh = boxes[edge['source']]
+    tx, ty, tw, th = boxes[edge['target']]
+    dx = (tx + tw / 2) - (sx + sw / 2)
+    dy = (ty + th / 2) - (sy + sh / 2)
+    if abs(dx) >= abs(dy):
+        if dx >= 0:
+            start, end = (sx + sw, sy + sh / 2), (tx, ty + th / 2)
+        else:
+            start, end = (sx, sy + sh / 2), (tx + tw, ty + th / 2)
+    elif dy >= 0:
+        start, end = (sx + sw / 2, sy + sh), (tx + tw / 2, ty)
+    else:
+        start, end = (sx + sw / 2, sy), (tx + tw / 2, ty + th)
+    # 'offset' shifts the whole arrow, e.g. to route it below boxes in between
+    ox, oy = edge.get('offset', (0, 0))
+    return (start[0] + ox, start[1] + oy), (end[0] + ox, end[1] + oy)
+
+def _arrow_heads(starts, ends, length=0.18, width=0.1):
+    """Triangles at each edge end, computed for all edges at once"""
+    direction = ends - starts
+    norms = np.linalg.norm(direction, axis=1, keepdims=True)
+    unit = np.divide(direction, norms, out=np.zeros_like(direction), where=norms > 0)
+    normal = np.stack([-unit[:, 1], unit[:, 0]], axis=1)
+    base = ends - unit * length
+    return np.stack([ends, base + normal * width, base - normal * width], axis=1)
+
+class DiagramRenderer:
+    """Draws node/edge specs onto one reusable figure
+    
+    Boxes are a single PatchCollection and arrows a single LineCollection
+    plus one collection of arrow heads, so per-element cost is mostly text.
+    With headless=True the figure uses the Agg canvas and never touches pyplot.
+    """
     
-    for start, end, label, color in arrows:
-        color = color if color else 'blue'
-        ax.annotate('', xy=end, xytext=start,
-                   arrowprops=dict(arrowstyle='->', color=color, lw=2))
-        if label:
-            mid_x = (start[0] + end[0]) / 2
-            mid_y = (start[1] + end[1]) / 2
-            ax.text(mid_x, mid_y, label, ha='center', va='center', 
-                   fontsize=8, bbox=dict(boxstyle="round,pad=0.3", 
-                                       facecolor='white', alpha=0.8))
+    def __init__(self, figsize=(15, 8), headless=True):
+        self.headless = headless
+        if headless:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.figure = Figure(figsize=figsize)
+            FigureCanvasAgg(self.figure)
+        else:
+            import matplotlib.pyplot as plt
+            self.figure = plt.figure(figsize=figsize)
+        self.ax = self.figure.add_subplot(1, 1, 1)
     
-    ax.set_xlim(0, 16)
-    ax.set_ylim(0, 8)
-    ax.set_aspect('equal')
-    ax.axis('off')
-    ax.set_title('Smart Agriculture System - Data Flow Diagram', 
-                fontsize=16, fontweight='bold', pad=20)
+    def draw(self, spec):
+        ax = self.ax
+        ax.cla()
+        
+        nodes = spec['nodes']
+        boxes = {node['id']: _node_box(node) for node in nodes}
+        
+        # Create elements
+        ax.add_collection(PatchCollection(
+            [patches.Rectangle((x, y), w, h) for x, y, w, h in boxes.values()],
+            facecolors=[node.get('color', gateway_color) for node in nodes],
+            edgecolors='black', alpha=0.7))
+        for node in nodes:
+            x, y, w, h = boxes[node['id']]
+            ax.text(x + w / 2, y + h / 2, node['label'], ha='center', va='center',
+                    fontweight='bold', fontsize=node.get('fontsize'))
+        
+        # Draw arrows
+        edges = spec['edges']
+        if edges:
+            points = np.array([_edge_points(edge, boxes) for edge in edges], dtype=float)
+            colors = [edge.get('color') or 'blue' for edge in edges]
+            ax.add_collection(LineCollection(points, colors=colors, linewidths=2))
+            ax.add_collection(PolyCollection(_arrow_heads(points[:, 0], points[:, 1]),
+                                             facecolors=colors, edgecolors=colors))
+            for edge, (start, end) in zip(edges, points):
+                if edge.get('label'):
+                    mid_x, mid_y = (start + end) / 2
+                    ax.text(mid_x, mid_y, edge['label'], ha='center', va='center',
+                            fontsize=8, bbox=dict(boxstyle="round,pad=0.3",
+                                                  facecolor='white', alpha=0.8))
+        
+        ax.set_xlim(*spec.get('xlim', (0, 16)))
+        ax.set_ylim(*spec.get('ylim', (0, 8)))
+        ax.set_aspect('equal')
+        ax.axis('off')
+        if spec.get('title'):
+            ax.set_title(spec['title'], fontsize=16, fontweight='bold', pad=20)
     
-    plt.tight_layout()
-    plt.savefig('smart_agriculture_data_flow.png', dpi=300, bbox_inches='tight')
-    plt.show()
+    def render(self, spec, output_path, dpi=300, fmt=None):
+        """Draw `spec` and save it; `fmt` (e.g. 'svg' or 'png') defaults to the file suffix"""
+        self.draw(spec)
+        self.figure.savefig(output_path, dpi=dpi, format=fmt, bbox_inches='tight')
+        return output_path
+
+def create_data_flow_diagram(spec=None, output_path='smart_agriculture_data_flow.png',
+                             dpi=300, fmt=None, show=True, renderer=None):
+    """Render the data flow diagram; show=False renders headless without blocking
+    
+    Pass a DiagramRenderer to reuse its figure across many calls.
+    """
+    if renderer is None:
+        renderer = DiagramRenderer(headless=not show)
+    renderer.render(spec or DEFAULT_SPEC, output_path, dpi=dpi, fmt=fmt)
+    if show and not renderer.headless:
+        import matplotlib.pyplot as plt
+        plt.show()
+    return output_path
 
 if __name__ == "__main__":
     create_data_flow_diagram()
+    
+    # Batch reporting: one headless figure reused for every farm's diagram
+    renderer = DiagramRenderer(headless=True)
+    for farm in range(3):
+        spec = dict(DEFAULT_SPEC, title=f'Farm {farm} - Data Flow Diagram')
+        create_data_flow_diagram(spec, f'farm_{farm}_data_flow.svg', show=False,
+                                 renderer=renderer)
@@ -0,0 +1,158 @@
+# Process-pool hyperparameter search for the crop yield forest
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import KFold
+
+from crop_yield_predictor import SmartAgriculturePredictor
+
+DEFAULT_PARAM_SPACE = {
+    'n_estimators': [50, 100, 200, 400],
+    'max_depth': [None, 8, 16, 32],
+    'min_samples_leaf': [1, 2, 4, 8],
+    'max_features': [1.0, 0.5, 'sqrt'],
+}
+
+# Set in each worker by _attach_shared_data
+_shared = {}
+
+def _share_array(array):
+    """Copy an array into a new shared memory block, returning (block, spec)"""
+    array = np.ascontiguousarray(array)
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+def _attach_shared_data(x_spec, y_spec):
+    """Worker initializer: map X and y from shared memory without copying"""
+    for key, (name, shape, dtype) in (('X', x_spec), ('y', y_spec)):
+        block = shared_memory.SharedMemory(name=name)
+        _shared[key + '_block'] = block  # keep the mapping alive
+        _shared[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+def _cross_validate(params, n_resources, n_splits, seed):
+    """Fit one candidate with k-fold CV on the first n_resources shuffled rows"""
+    X, y = _shared['X'], _shared['y']
+    rows = np.random.default_rng(seed).permutation(len(X))[:n_resources]
+    
+    maes, r2s = [], []
+    start_time = time.perf_counter()
+    for train_idx, test_idx in KFold(n_splits, shuffle=True, random_state=seed).split(rows):
+        # Only the fold being fitted is materialized in this worker
+        model = RandomForestRegressor(n_jobs=1, random_state=seed, **params)
+        model.fit(X[rows[train_idx]], y[rows[train_idx]])
+        y_pred = model.predict(X[rows[test_idx]])
+        maes.append(mean_absolute_error(y[rows[test_idx]], y_pred))
+        r2s.append(r2_score(y[rows[test_idx]], y_pred))
+    
+    return {
+        'params': params,
+        'n_resources': n_resources,
+        'mean_mae': float(np.mean(maes)),
+        'std_mae': float(np.std(maes)),
+        'mean_r2': float(np.mean(r2s)),
+        'fit_time_s': time.perf_counter() - start_time,
+    }
+
+def sample_candidates(param_space, n_candidates, seed=42):
+    """Draw random parameter sets; values are lists or objects with .rvs()"""
+    rng = np.random.default_rng(seed)
+    candidates = []
+    for _ in range(n_candidates):
+        params = {}
+        for name, values in param_space.items():
+            if hasattr(values, 'rvs'):
+                params[name] = values.rvs(random_state=rng)
+            else:
+                params[name] = values[rng.integers(len(values))]
+                # Keep plain Python types so the table and refit are clean
+                if isinstance(params[name], np.generic):
+                    params[name] = params[name].item()
+        candidates.append(params)
+    return candidates
+
+def tune_hyperparameters(df, search='halving', param_space=None, n_candidates=32,
+                         n_splits=5, eta=3, min_resources=None, max_workers=None, seed=42):
+    """Search forest parameters with k-fold CV across a process pool
+    
+    search='random' scores every candidate on all rows. search='halving'
+    scores all candidates on min_resources rows, keeps the best 1/eta and
+    multiplies the rows by eta until the full data is used. Workers read the
+    feature matrix from shared memory instead of receiving a pickled copy per
+    task. Returns a predictor refit with the best parameters and the table of
+    every evaluation.
+    """
+    if search not in ('random', 'halving'):
+        raise ValueError("search must be 'random' or 'halving'")
+    
+    X = df.drop('crop_yield', axis=1)
+    X = X.to_numpy(dtype=np.float32)
+    y = df['crop_yield'].to_numpy(dtype=np.float64)
+    n_rows = len(X)
+    
+    candidates = sample_candidates(param_space or DEFAULT_PARAM_SPACE, n_candidates, seed)
+    if search == 'random':
+        schedule = [n_rows]
+    else:
+        # floor(log_eta(n_candidates)) + 1 rounds, counted in integers to avoid
+        # float log rounding (math.log(1000, 10) is 2.9999999999999996)
+        n_rounds = 1
+        while eta ** n_rounds <= len(candidates):
+            n_rounds += 1
+        min_resources = min_resources or max(n_splits * 20, n_rows // eta ** (n_rounds - 1))
+        schedule = [min(n_rows, min_resources * eta ** i) for i in range(n_rounds)]
+        # The last round always scores on the full data, whatever min_resources was
+        schedule[-1] = n_rows
+    
+    x_block, x_spec = _share_array(X)
+    y_block, y_spec = _share_array(y)
+    rows = []
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                 initializer=_attach_shared_data,
+                                 initargs=(x_spec, y_spec)) as executor:
+            for round_index, n_resources in enumerate(schedule):
+                futures = [executor.submit(_cross_validate, params, n_resources, n_splits, seed)
+                           for params in candidates]
+                results = [future.result() for future in futures]
+                for result in results:
+                    result['round'] = round_index
+                rows.extend(results)
+                
+                results.sort(key=lambda result: result['mean_mae'])
+                print(f"Round {round_index}: {len(results)} candidates on {n_resources} rows, "
+                      f"best MAE {results[0]['mean_mae']:.3f}")
+                candidates = [result['params'] for result in results[:max(1, len(results) // eta)]]
+                if n_resources >= n_rows:
+                    break
+    finally:
+        for block in (x_block, y_block):
+            block.close()
+            block.unlink()
+    
+    table = pd.DataFrame(rows)
+    table = pd.concat([table.drop(columns='params'), pd.json_normalize(table['params'])], axis=1)
+    table = table.sort_values(['round', 'mean_mae'], ascending=[False, True]).reset_index(drop=True)
+    
+    # Best candidate of the last round, i.e. scored on the most rows
+    last_round = max(row['round'] for row in rows)
+    best_params = min((row for row in rows if row['round'] == last_round),
+                      key=lambda row: row['mean_mae'])['params']
+    print(f"Best parameters: {best_params}")
+    
+    predictor = SmartAgriculturePredictor(random_state=seed, **best_params)
+    predictor.train_model(df)
+    return predictor, table
+
+if __name__ == "__main__":
+    predictor = SmartAgriculturePredictor()
+    df = predictor.generate_sample_data(n_samples=5000)
+    
+    best_predictor, table = tune_hyperparameters(df, search='halving', n_candidates=27)
+    print(table.head(10).to_string())
@@ -0,0 +1,100 @@
+# Benchmark crop yield prediction throughput
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from crop_yield_predictor import SmartAgriculturePredictor
+
+def benchmark_batch_prediction(n_rows=20000, n_single=200):
+    """Compare per-row predict_yield with predict_yield_batch"""
+    predictor = SmartAgriculturePredictor()
+    predictor.train_model(predictor.generate_sample_data())
+    
+    readings = predictor.generate_sample_data(n_samples=n_rows).drop('crop_yield', axis=1)
+    rows = readings.to_numpy()
+    
+    # Per-row: one model.predict call per reading
+    start_time = time.perf_counter()
+    for row in rows[:n_single]:
+        predictor.predict_yield(list(row))
+    per_row_rate = n_single / (time.perf_counter() - start_time)
+    
+    results = {'per_row': per_row_rate}
+    for chunk_size in (1000, 10000):
+        start_time = time.perf_counter()
+        predictor.predict_yield_batch(readings, chunk_size=chunk_size)
+        results[f'batch (chunk_size={chunk_size})'] = n_rows / (time.perf_counter() - start_time)
+    
+    print(f"\nPrediction throughput ({n_rows} readings)")
+    for name, rate in results.items():
+        print(f"{name:28s} {rate:12.0f} readings/sec  {rate / per_row_rate:8.1f}x")
+    
+    return results
+
+def benchmark_compiled_latency(n_single=1000):
+    """Compare single-reading latency of model.predict and the compiled forest"""
+    predictor = SmartAgriculturePredictor()
+    predictor.train_model(predictor.generate_sample_data())
+    compiled = predictor.compile_model()
+    
+    readings = predictor.generate_sample_data(n_samples=n_single).drop('crop_yield', axis=1)
+    rows = readings.to_numpy()
+    
+    # The compiled tables must reproduce the sklearn forest
+    expected = predictor.model.predict(readings)
+    actual = compiled.predict(rows)
+    if not np.allclose(expected, actual):
+        raise AssertionError(f"Compiled forest diverges from model.predict "
+                             f"(max abs diff {np.max(np.abs(expected - actual)):.3g})")
+    
+    results = {}
+    for name, predict in (('model.predict', lambda row: predictor.model.predict(row.reshape(1, -1))),
+                          ('compiled', compiled.predict_one)):
+        latencies = []
+        for row in rows:
+            start_time = time.perf_counter()
+            predict(row)
+            latencies.append(time.perf_counter() - start_time)
+        results[name] = np.percentile(np.array(latencies) * 1e6, [50, 95, 99])
+    
+    print(f"\nSingle-reading latency ({n_single} readings, {compiled.n_trees} trees)")
+    for name, (p50, p95, p99) in results.items():
+        print(f"{name:16s} p50 {p50:9.1f} us  p95 {p95:9.1f} us  p99 {p99:9.1f} us")
+    
+    return results
+
+def benchmark_cold_start(n_samples=1000, n_loads=5):
+    """Compare service start-up by retraining with loading a saved artifact"""
+    df = SmartAgriculturePredictor().generate_sample_data(n_samples=n_samples)
+    
+    start_time = time.perf_counter()
+    predictor = SmartAgriculturePredictor()
+    predictor.train_model(df)
+    results = {'retrain': time.perf_counter() - start_time}
+    
+    artifact_dir = tempfile.mkdtemp()
+    try:
+        predictor.save(artifact_dir)
+        for name, scoring_only in (('load', False), ('load (compiled mmap)', True)):
+            start_time = time.perf_counter()
+            for _ in range(n_loads):
+                SmartAgriculturePredictor.load(artifact_dir, scoring_only=scoring_only)
+            results[name] = (time.perf_counter() - start_time) / n_loads
+        artifact_size = sum(os.path.getsize(os.path.join(root, name))
+                            for root, _, names in os.walk(artifact_dir) for name in names)
+    finally:
+        shutil.rmtree(artifact_dir)
+    
+    print(f"\nCold start ({n_samples} training rows, artifact {artifact_size / 1e6:.1f} MB)")
+    for name, elapsed in results.items():
+        print(f"{name:22s} {elapsed * 1000:10.1f} ms  {results['retrain'] / elapsed:8.1f}x")
+    
+    return results
+
+if __name__ == "__main__":
+    benchmark_batch_prediction()
+    benchmark_compiled_latency()
+    benchmark_cold_start()
@@ -0,0 +1,126 @@
+# Columnar, memory-mapped storage for agricultural training data
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+class ColumnarDataset:
+    """Sensor readings stored as float32 columns in .npy files
+    
+    Features live in one Fortran-ordered (n_rows x n_features) array, so each
+    sensor column is contiguous on disk, and the target in its own array.
+    Both are opened as read-only memory maps.
+    """
+    
+    def __init__(self, directory):
+        with open(os.path.join(directory, 'metadata.json')) as f:
+            self.metadata = json.load(f)
+        self.directory = directory
+        self.feature_names = self.metadata['feature_names']
+        self.target_name = self.metadata['target_name']
+        self.X = np.load(os.path.join(directory, 'features.npy'), mmap_mode='r')
+        self.y = np.load(os.path.join(directory, 'target.npy'), mmap_mode='r')
+    
+    def __len__(self):
+        return len(self.y)
+    
+    @classmethod
+    def write(cls, chunks, directory, target_name='crop_yield'):
+        """Write DataFrame chunks to `directory`, one chunk in memory at a time
+        
+        Files are built in a staging directory and renamed into place at the
+        end, metadata.json last, so a crash never leaves a loadable partial dataset.
+        """
+        os.makedirs(directory, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=directory)
+        try:
+            feature_names, column_paths, n_rows = None, None, 0
+            target_path = os.path.join(staging, 'target.f32')
+            with contextlib.ExitStack() as stack:
+                target_file = stack.enter_context(open(target_path, 'wb'))
+                for chunk in chunks:
+                    if feature_names is None:
+                        feature_names = [c for c in chunk.columns if c != target_name]
+                        column_paths = [os.path.join(staging, f'{i}.f32')
+                                        for i in range(len(feature_names))]
+                        column_files = [stack.enter_context(open(path, 'wb'))
+                                        for path in column_paths]
+                    for name, column_file in zip(feature_names, column_files):
+                        chunk[name].to_numpy(dtype='<f4').tofile(column_file)
+                    chunk[target_name].to_numpy(dtype='<f4').tofile(target_file)
+                    n_rows += len(chunk)
+            
+            if feature_names is None:
+                raise ValueError("No chunks to write: the chunk iterable was empty")
+            
+            # A Fortran-ordered .npy body is just the columns back to back
+            with open(os.path.join(staging, 'features.npy'), 'wb') as out:
+                np.lib.format.write_array_header_1_0(out, {
+                    'descr': '<f4', 'fortran_order': True,
+                    'shape': (n_rows, len(feature_names)),
+                })
+                for path in column_paths:
+                    with open(path, 'rb') as f:
+                        shutil.copyfileobj(f, out)
+            
+            with open(os.path.join(staging, 'target.npy'), 'wb') as out:
+                np.lib.format.write_array_header_1_0(out, {
+                    'descr': '<f4', 'fortran_order': False, 'shape': (n_rows,),
+                })
+                with open(target_path, 'rb') as f:
+                    shutil.copyfileobj(f, out)
+            
+            with open(os.path.join(staging, 'metadata.json'), 'w') as f:
+                json.dump({'feature_names': feature_names, 'target_name': target_name,
+                           'n_rows': n_rows, 'dtype': 'float32'}, f, indent=2)
+            
+            # Unpublish any previous dataset first, publish the new one metadata last
+            metadata_path = os.path.join(directory, 'metadata.json')
+            if os.path.exists(metadata_path):
+                os.remove(metadata_path)
+            for name in ('features.npy', 'target.npy', 'metadata.json'):
+                os.replace(os.path.join(staging, name), os.path.join(directory, name))
+        finally:
+            shutil.rmtree(staging)
+        
+        return cls(directory)
+    
+    def stratified_sample(self, fraction, n_bins=10, seed=42):
+        """Draw a subsample with the same target distribution as the full data
+        
+        Rows are stratified on quantile bins of the target. Only the sample is
+        copied into memory; returned rows keep their on-disk order.
+        """
+        y = np.asarray(self.y)
+        edges = np.quantile(y, np.linspace(0, 1, n_bins + 1)[1:-1])
+        bins = np.searchsorted(edges, y, side='right')
+        
+        rng = np.random.default_rng(seed)
+        indices = []
+        for b in range(n_bins):
+            members = np.flatnonzero(bins == b)
+            n_take = int(round(len(members) * fraction))
+            if n_take:
+                indices.append(rng.choice(members, n_take, replace=False))
+        indices = np.sort(np.concatenate(indices))
+        
+        return np.asfortranarray(self.X[indices]), np.asarray(self.y[indices])
+
+# Example usage
+if __name__ == "__main__":
+    from crop_yield_predictor import SmartAgriculturePredictor
+    
+    predictor = SmartAgriculturePredictor()
+    chunks = (predictor.generate_sample_data(n_samples=50000) for _ in range(4))
+    dataset = ColumnarDataset.write(chunks, 'sensor_dataset')
+    print(f"Wrote {len(dataset)} readings to {dataset.directory}")
+    
+    # Quick experiment on a 10% stratified subsample
+    X_sample, y_sample = dataset.stratified_sample(0.1)
+    predictor.train_from_arrays(X_sample, y_sample, dataset.feature_names)
+    
+    # Full run straight from the memory maps
+    predictor.train_from_arrays(dataset.X, dataset.y, dataset.feature_names)
@@ -0,0 +1,232 @@
+# Streaming sensor ingestion with rolling per-field features
+import collections
+import io
+import json
+import socket
+import time
+
+import numpy as np
+import pandas as pd
+
+SENSOR_COLUMNS = ['soil_moisture', 'temperature', 'humidity',
+                  'nitrogen', 'phosphorus', 'potassium', 'ph_level']
+
+def read_csv_chunks(source, chunk_size=1000):
+    """Yield DataFrames of `chunk_size` readings from a CSV file or file object"""
+    yield from pd.read_csv(source, chunksize=chunk_size)
+
+def read_jsonl_chunks(source, chunk_size=1000):
+    """Yield DataFrames of `chunk_size` readings from a JSON-lines file or file object"""
+    with pd.read_json(source, lines=True, chunksize=chunk_size) as reader:
+        yield from reader
+
+SOCKET_FORMATS = ('jsonl', 'csv')
+
+def _parse_lines(lines, fmt, header, columns):
+    """Turn raw JSON or CSV lines into a DataFrame, typed like the file readers"""
+    if fmt == 'jsonl':
+        return pd.DataFrame.from_records([json.loads(line) for line in lines])
+    if columns is not None:
+        return pd.read_csv(io.StringIO('\n'.join(lines)), header=None, names=columns)
+    return pd.read_csv(io.StringIO('\n'.join([header] + lines)))
+
+def read_socket_chunks(host, port, chunk_size=1000, max_wait=1.0, fmt='jsonl', columns=None):
+    """Yield DataFrames of readings sent over a TCP socket as JSON lines or CSV
+    
+    A chunk is yielded once `chunk_size` readings have arrived or `max_wait`
+    seconds after its first reading, whichever comes first, so a slow feed
+    still produces timely micro-batches. A CSV feed starts with a header line
+    unless `columns` is given.
+    """
+    if fmt not in SOCKET_FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {SOCKET_FORMATS}")
+    
+    header = None
+    lines = []
+    deadline = None
+    pending = b''
+    with socket.create_connection((host, port)) as conn:
+        while True:
+            # Flush before waiting: settimeout(0) would make recv non-blocking
+            if lines and (len(lines) >= chunk_size or time.monotonic() >= deadline):
+                for start in range(0, len(lines), chunk_size):
+                    yield _parse_lines(lines[start:start + chunk_size], fmt, header, columns)
+                lines = []
+                deadline = None
+            
+            timeout = None if deadline is None else deadline - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                continue  # the deadline passed since the check above
+            conn.settimeout(timeout)
+            try:
+                data = conn.recv(65536)
+            except socket.timeout:
+                continue
+            if data == b'':
+                break  # connection closed
+            
+            *complete, pending = (pending + data).split(b'\n')
+            for line in complete:
+                line = line.decode().strip()
+                if not line:
+                    continue
+                if fmt == 'csv' and columns is None and header is None:
+                    header = line
+                    continue
+                lines.append(line)
+                if deadline is None:
+                    deadline = time.monotonic() + max_wait
+    
+    # A final reading without a trailing newline
+    line = pending.decode().strip()
+    if line and not (fmt == 'csv' and columns is None and header is None):
+        lines.append(line)
+    for start in range(0, len(lines), chunk_size):
+        yield _parse_lines(lines[start:start + chunk_size], fmt, header, columns)
+
+class RollingWindow:
+    def __init__(self, n_sensors, window=60, alpha=0.1):
+        self.window = window
+        self.alpha = alpha
+        
+        # Ring buffer of the last `window` readings and their running sum
+        self.buffer = np.zeros((window, n_sensors))
+        self.total = np.zeros(n_sensors)
+        self.ewma = None
+        self.count = 0
+        
+        # Monotonic deques of (position, value) give amortized O(1) min/max
+        self._mins = [collections.deque() for _ in range(n_sensors)]
+        self._maxs = [collections.deque() for _ in range(n_sensors)]
+    
+    def update(self, values):
+        """Add one reading in O(1), evicting the oldest once the window is full"""
+        slot = self.count % self.window
+        if self.count >= self.window:
+            self.total -= self.buffer[slot]
+        self.buffer[slot] = values
+        self.total += values
+        
+        # Recompute the sum now and then so float error cannot build up over months
+        if self.count % (self.window * 1000) == 0:
+            self.total = self.buffer.sum(axis=0)
+        
+        if self.ewma is None:
+            self.ewma = np.array(values, dtype=np.float64)
+        else:
+            self.ewma += self.alpha * (values - self.ewma)
+        
+        oldest = self.count - self.window
+        for i, value in enumerate(values):
+            mins, maxs = self._mins[i], self._maxs[i]
+            while mins and mins[-1][1] >= value:
+                mins.pop()
+            mins.append((self.count, value))
+            if mins[0][0] <= oldest:
+                mins.popleft()
+            while maxs and maxs[-1][1] <= value:
+                maxs.pop()
+            maxs.append((self.count, value))
+            if maxs[0][0] <= oldest:
+                maxs.popleft()
+        
+        self.count += 1
+    
+    def mean(self):
+        return self.total / min(self.count, self.window)
+    
+    def minimum(self):
+        return np.array([mins[0][1] for mins in self._mins])
+    
+    def maximum(self):
+        return np.array([maxs[0][1] for maxs in self._maxs])
+
+class SensorStreamProcessor:
+    def __init__(self, predictor, window=60, alpha=0.1, feature='mean',
+                 max_fields=10000, sensor_columns=SENSOR_COLUMNS):
+        if feature not in ('mean', 'ewma'):
+            raise ValueError("feature must be 'mean' or 'ewma'")
+        
+        self.predictor = predictor
+        self.window = window
+        self.alpha = alpha
+        self.feature = feature
+        self.sensor_columns = list(sensor_columns)
+        
+        # Per-field windows, least recently updated first; capped at max_fields
+        self.max_fields = max_fields
+        self.fields = collections.OrderedDict()
+    
+    def _field_window(self, field_id):
+        window = self.fields.get(field_id)
+        if window is None:
+            window = RollingWindow(len(self.sensor_columns), self.window, self.alpha)
+            self.fields[field_id] = window
+            if len(self.fields) > self.max_fields:
+                self.fields.popitem(last=False)
+        else:
+            self.fields.move_to_end(field_id)
+        return window
+    
+    def update(self, chunk):
+        """Fold a chunk of readings into the rolling windows, returning the fields touched"""
+        values = chunk[self.sensor_columns].to_numpy(dtype=np.float64)
+        if 'field_id' in chunk.columns:
+            field_ids = chunk['field_id'].to_numpy()
+        else:
+            field_ids = np.full(len(chunk), 'default', dtype=object)
+        
+        touched = {}
+        for field_id, reading in zip(field_ids, values):
+            window = self._field_window(field_id)
+            window.update(reading)
+            touched[field_id] = window
+        return touched
+    
+    def process(self, chunks):
+        """Consume reading chunks and yield one scored micro-batch per chunk
+        
+        Each micro-batch has a row per field seen in the chunk with its rolling
+        mean/min/max/EWMA per sensor and the yield predicted from the rolling
+        `feature`. Memory depends only on max_fields and window, never on how
+        long the stream runs.
+        """
+        for chunk in chunks:
+            touched = self.update(chunk)
+            if not touched:
+                continue
+            
+            field_ids = list(touched)
+            windows = [touched[field_id] for field_id in field_ids]
+            aggregates = {
+                'mean': np.array([w.mean() for w in windows]),
+                'min': np.array([w.minimum() for w in windows]),
+                'max': np.array([w.maximum() for w in windows]),
+                'ewma': np.array([w.ewma for w in windows]),
+            }
+            
+            batch = {'field_id': field_ids,
+                     'n_readings': [min(w.count, self.window) for w in windows]}
+            for stat, table in aggregates.items():
+                for i, column in enumerate(self.sensor_columns):
+                    batch[f'{column}_{stat}'] = table[:, i]
+            batch['predicted_yield'] = self.predictor.predict_yield_batch(aggregates[self.feature])
+            
+            yield pd.DataFrame(batch)
+
+# Example usage
+if __name__ == "__main__":
+    from crop_yield_predictor import SmartAgriculturePredictor
+    
+    predictor = SmartAgriculturePredictor()
+    df = predictor.generate_sample_data()
+    predictor.train_model(df)
+    
+    # Simulate a JSON-lines feed from 20 fields
+    readings = df.drop('crop_yield', axis=1)
+    readings.insert(0, 'field_id', [f'field-{i % 20:02d}' for i in range(len(readings))])
+    feed = io.StringIO(readings.to_json(orient='records', lines=True))
+    
+    processor = SensorStreamProcessor(predictor, window=30)
+    for micro_batch in processor.process(read_jsonl_chunks(feed, chunk_size=250)):
+        print(micro_batch[['field_id', 'n_readings', 'predicted_yield']].head())
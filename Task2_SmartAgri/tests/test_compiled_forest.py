@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from compiled_forest import CompiledForest
+from crop_yield_predictor import SmartAgriculturePredictor
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, size=(500, 7)).astype(np.float32)
+    y = X[:, 0] * 0.3 + X[:, 3] * 0.15 + rng.normal(0, 5, len(X))
+    return X, y
+
+@pytest.mark.parametrize('max_depth', [None, 3])
+def test_matches_model_predict(data, max_depth):
+    X, y = data
+    forest = RandomForestRegressor(n_estimators=15, max_depth=max_depth, random_state=0)
+    forest.fit(X, y)
+    
+    compiled = CompiledForest.from_sklearn(forest)
+    np.testing.assert_allclose(compiled.predict(X), forest.predict(X))
+    np.testing.assert_allclose(compiled.predict(X, chunk_size=37), forest.predict(X))
+    assert compiled.predict_one(X[0]) == pytest.approx(forest.predict(X[:1])[0])
+
+def test_saved_tables_match_model_predict(data, tmp_path):
+    X, y = data
+    forest = RandomForestRegressor(n_estimators=10, random_state=0).fit(X, y)
+    CompiledForest.from_sklearn(forest).save_tables(tmp_path)
+    
+    loaded = CompiledForest.load_tables(tmp_path, mmap_mode='r')
+    assert isinstance(loaded.value, np.memmap)
+    np.testing.assert_allclose(loaded.predict(X), forest.predict(X))
+
+def test_scoring_only_predictor_matches_full_predictor(tmp_path):
+    predictor = SmartAgriculturePredictor(n_estimators=10, n_jobs=1)
+    df = predictor.generate_sample_data(n_samples=300)
+    predictor.train_model(df)
+    predictor.save(tmp_path)
+    
+    scoring = SmartAgriculturePredictor.load(tmp_path, scoring_only=True)
+    readings = df.drop('crop_yield', axis=1)
+    np.testing.assert_allclose(scoring.predict_yield_batch(readings),
+                               predictor.model.predict(readings.to_numpy(dtype=np.float32)))
+
+def test_resave_does_not_disturb_mapped_predictor(tmp_path):
+    df = SmartAgriculturePredictor().generate_sample_data(n_samples=300)
+    readings = df.drop('crop_yield', axis=1)
+    first = SmartAgriculturePredictor(n_estimators=5, n_jobs=1, random_state=1)
+    first.train_model(df)
+    first.save(tmp_path)
+    
+    mapped = SmartAgriculturePredictor.load(tmp_path, scoring_only=True)
+    expected = mapped.predict_yield_batch(readings)
+    
+    # Saving a different forest over the live directory replaces files by rename
+    second = SmartAgriculturePredictor(n_estimators=7, n_jobs=1, random_state=2)
+    second.train_model(df)
+    second.save(tmp_path)
+    
+    np.testing.assert_allclose(mapped.predict_yield_batch(readings), expected)
+    reloaded = SmartAgriculturePredictor.load(tmp_path, scoring_only=True)
+    assert reloaded.compiled.n_trees == 7
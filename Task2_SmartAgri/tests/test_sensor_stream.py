@@ -0,0 +1,107 @@
+import socket
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sensor_stream import SENSOR_COLUMNS, RollingWindow, SensorStreamProcessor, read_socket_chunks
+
+def serve_once(payloads, pause=0.0):
+    """Serve `payloads` to one client on a local port, pausing between them"""
+    server = socket.create_server(('127.0.0.1', 0))
+    
+    def handle():
+        conn, _ = server.accept()
+        with conn:
+            for payload in payloads:
+                conn.sendall(payload)
+                time.sleep(pause)
+        server.close()
+    
+    threading.Thread(target=handle, daemon=True).start()
+    return server.getsockname()[1]
+
+@pytest.mark.parametrize('window', [1, 5, 16])
+def test_rolling_window_matches_brute_force(window):
+    rng = np.random.default_rng(window)
+    # Small integers give plenty of ties for the monotonic deques
+    stream = rng.integers(0, 10, size=(window * 7 + 3, 3)).astype(np.float64)
+    alpha = 0.2
+    
+    rolling = RollingWindow(n_sensors=3, window=window, alpha=alpha)
+    ewma = stream[0].copy()
+    for i, reading in enumerate(stream):
+        rolling.update(reading)
+        if i:
+            ewma += alpha * (reading - ewma)
+        
+        recent = stream[max(0, i + 1 - window):i + 1]
+        np.testing.assert_allclose(rolling.mean(), recent.mean(axis=0))
+        np.testing.assert_array_equal(rolling.minimum(), recent.min(axis=0))
+        np.testing.assert_array_equal(rolling.maximum(), recent.max(axis=0))
+        np.testing.assert_allclose(rolling.ewma, ewma)
+
+def test_running_sum_resync_keeps_mean_exact():
+    # Cross the periodic recompute of the running sum (every window * 1000 readings)
+    window = 2
+    stream = np.random.default_rng(0).normal(size=(window * 1000 + 5, 1))
+    rolling = RollingWindow(n_sensors=1, window=window)
+    for reading in stream:
+        rolling.update(reading)
+    np.testing.assert_allclose(rolling.mean(), stream[-window:].mean(axis=0))
+
+def test_socket_chunks_flush_after_max_wait():
+    # The feed stalls far longer than max_wait after the first two readings
+    port = serve_once([b'{"a": 1}\n{"a": 2}\n', b'{"a": 3}\n{"a"', b': 4}'], pause=0.5)
+    
+    start = time.monotonic()
+    chunks = read_socket_chunks('127.0.0.1', port, chunk_size=100, max_wait=0.05)
+    first = next(chunks)
+    assert time.monotonic() - start < 0.4
+    assert first['a'].tolist() == [1, 2]
+    
+    # A final reading without a trailing newline is still delivered
+    rest = pd.concat(list(chunks))
+    assert rest['a'].tolist() == [3, 4]
+
+def test_socket_chunks_split_at_chunk_size():
+    lines = b''.join(b'{"a": %d}\n' % i for i in range(10))
+    port = serve_once([lines])
+    chunks = list(read_socket_chunks('127.0.0.1', port, chunk_size=4, max_wait=10))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    assert pd.concat(chunks)['a'].tolist() == list(range(10))
+
+def test_socket_chunks_parse_csv():
+    port = serve_once([b'field_id,soil_moisture\nf1,20.5\n', b'f2,31\n'])
+    frame = pd.concat(read_socket_chunks('127.0.0.1', port, fmt='csv', max_wait=0.05))
+    assert frame['field_id'].tolist() == ['f1', 'f2']
+    assert frame['soil_moisture'].tolist() == [20.5, 31.0]
+    
+    port = serve_once([b'f1,20.5\n'])
+    frame = pd.concat(read_socket_chunks('127.0.0.1', port, fmt='csv', max_wait=0.05,
+                                         columns=['field_id', 'soil_moisture']))
+    assert frame.columns.tolist() == ['field_id', 'soil_moisture']
+
+class SumPredictor:
+    def predict_yield_batch(self, X):
+        return np.asarray(X).sum(axis=1)
+
+def test_processor_scores_rolling_features_per_field():
+    rng = np.random.default_rng(0)
+    readings = pd.DataFrame(rng.uniform(0, 10, size=(12, len(SENSOR_COLUMNS))),
+                            columns=SENSOR_COLUMNS)
+    readings.insert(0, 'field_id', ['a', 'b'] * 6)
+    
+    processor = SensorStreamProcessor(SumPredictor(), window=3)
+    batches = list(processor.process([readings.iloc[:6], readings.iloc[6:]]))
+    assert len(batches) == 2
+    
+    last = batches[-1].set_index('field_id')
+    for field_id in ('a', 'b'):
+        recent = readings[readings['field_id'] == field_id][SENSOR_COLUMNS].iloc[-3:]
+        assert last.loc[field_id, 'n_readings'] == 3
+        np.testing.assert_allclose(last.loc[field_id, [f'{c}_mean' for c in SENSOR_COLUMNS]],
+                                   recent.mean())
+        np.testing.assert_allclose(last.loc[field_id, 'predicted_yield'], recent.mean().sum())
@@ -0,0 +1,70 @@
+# Import-time benchmark for the CLI entry points
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> directory it is run from
+ENTRY_POINTS = {
+    'edge_ai_classifier': 'Task1_EdgeAI',
+    'streaming_classifier': 'Task1_EdgeAI',
+    'crop_yield_predictor': 'Task2_SmartAgri',
+    'quantum_circuit': 'Bonus_Quantum',
+}
+
+def time_command(code, cwd, repeats):
+    """Median wall time in ms of running `python -c code` in a fresh interpreter"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, '-c', code], cwd=cwd,
+                                   capture_output=True, text=True)
+        timings.append((time.perf_counter() - start) * 1000)
+        if completed.returncode != 0:
+            return None, completed.stderr.strip().splitlines()[-1]
+    return statistics.median(timings), None
+
+def measure_import_times(modules, repeats=5):
+    """Import time of each module, net of bare interpreter start-up"""
+    baseline_ms, _ = time_command('pass', REPO_ROOT, repeats)
+    results = {}
+    for module in modules:
+        elapsed_ms, error = time_command(f'import {module}',
+                                         os.path.join(REPO_ROOT, ENTRY_POINTS[module]), repeats)
+        if error:
+            results[module] = {'error': error}
+        else:
+            results[module] = {'import_ms': elapsed_ms - baseline_ms}
+    return {'interpreter_startup_ms': baseline_ms, 'modules': results}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure entry-point import time')
+    parser.add_argument('modules', nargs='*', help=f"default: {', '.join(ENTRY_POINTS)}")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float,
+                        help='fail if any module takes longer than this to import')
+    args = parser.parse_args()
+    unknown = [name for name in args.modules if name not in ENTRY_POINTS]
+    if unknown:
+        parser.error(f"unknown modules: {', '.join(unknown)}")
+    
+    report = measure_import_times(args.modules or list(ENTRY_POINTS), args.repeats)
+    print(json.dumps(report, indent=2))
+    
+    if args.budget_ms is not None:
+        # A module that fails to import is a broken entry point, not a fast one
+        failed = [module for module, stats in report['modules'].items() if 'error' in stats]
+        over_budget = [module for module, stats in report['modules'].items()
+                       if 'error' not in stats and stats['import_ms'] > args.budget_ms]
+        for module in failed:
+            print(f"IMPORT FAILED {module}: {report['modules'][module]['error']}",
+                  file=sys.stderr)
+        for module in over_budget:
+            print(f"OVER BUDGET {module}: {report['modules'][module]['import_ms']:.0f} ms "
+                  f"> {args.budget_ms:.0f} ms", file=sys.stderr)
+        sys.exit(1 if failed or over_budget else 0)
@@ -0,0 +1,243 @@
+# Benchmark suite for the edge classification and yield prediction hot paths
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE_DIRS = ['Task1_EdgeAI', 'Task2_SmartAgri', 'Bonus_Quantum']
+
+def measure(fn, n_iter, items_per_call=1, warmup=3):
+    """Time `fn` with perf_counter_ns and summarize latency and throughput"""
+    import numpy as np
+    
+    for _ in range(warmup):
+        fn()
+    
+    latencies = np.empty(n_iter, dtype=np.float64)
+    for i in range(n_iter):
+        start = time.perf_counter_ns()
+        fn()
+        latencies[i] = time.perf_counter_ns() - start
+    
+    latencies_ms = latencies / 1e6
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return {
+        'iterations': n_iter,
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'mean_ms': float(latencies_ms.mean()),
+        'throughput_per_s': float(items_per_call * n_iter / (latencies.sum() / 1e9)),
+    }
+
+def _sample_image():
+    import numpy as np
+    from PIL import Image
+    
+    path = os.path.join(tempfile.gettempdir(), 'benchmark_sample.jpg')
+    if not os.path.exists(path):
+        noise = np.random.default_rng(0).integers(0, 256, (480, 640, 3), dtype=np.uint8)
+        Image.fromarray(noise).save(path, quality=90)
+    return path
+
+def bench_preprocess_image(options):
+    from edge_ai_classifier import EdgeAIClassifier
+    
+    image_path = _sample_image()
+    # preprocess_image does not touch classifier state, so no model is needed
+    return {'640x480 jpeg': measure(lambda: EdgeAIClassifier.preprocess_image(None, image_path),
+                                    options['iterations'])}
+
+def bench_classify(options):
+    from edge_ai_classifier import EdgeAIClassifier
+    
+    if not os.path.exists(options['model']):
+        return {'skipped': f"model {options['model']} not found"}
+    classifier = EdgeAIClassifier(options['model'])
+    image_path = _sample_image()
+    return {'single image': measure(lambda: classifier.classify(image_path), options['iterations'])}
+
+def _trained_predictor(n_samples=1000):
+    from crop_yield_predictor import SmartAgriculturePredictor
+    
+    predictor = SmartAgriculturePredictor()
+    predictor.train_model(predictor.generate_sample_data(n_samples))
+    return predictor
+
+def bench_predict_yield(options):
+    predictor = _trained_predictor()
+    reading = [35, 25, 65, 45, 25, 50, 6.5]
+    return {'single reading': measure(lambda: predictor.predict_yield(reading),
+                                      options['iterations'])}
+
+def bench_train_model(options):
+    from crop_yield_predictor import SmartAgriculturePredictor
+    
+    results = {}
+    for n_samples in options['train_sizes']:
+        predictor = SmartAgriculturePredictor()
+        df = predictor.generate_sample_data(n_samples)
+        results[f'{n_samples} rows'] = measure(lambda: predictor.train_model(df), n_iter=3,
+                                               items_per_call=n_samples, warmup=0)
+    return results
+
+def bench_run_simulation(options):
+    from quantum_circuit import QuantumAIDemo
+    
+    demo = QuantumAIDemo()
+    results = {}
+    for n_qubits in options['qubit_counts']:
+        circuit = demo.create_quantum_optimization(n_qubits)
+        results[f'{n_qubits} qubits'] = measure(lambda: demo.run_simulation(circuit, shots=1000),
+                                                n_iter=max(3, options['iterations'] // 20),
+                                                warmup=1)
+    return results
+
+SCENARIOS = {
+    'preprocess_image': bench_preprocess_image,
+    'classify': bench_classify,
+    'predict_yield': bench_predict_yield,
+    'train_model': bench_train_model,
+    'run_simulation': bench_run_simulation,
+}
+
+def _run_scenario(name, options, results):
+    """Run one scenario in a fresh process so peak RSS is per scenario"""
+    for module_dir in MODULE_DIRS:
+        sys.path.insert(0, os.path.join(REPO_ROOT, module_dir))
+    
+    # The scenarios print progress; keep it out of the JSON report
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        cases = SCENARIOS[name](options)
+    except ImportError as error:
+        cases = {'skipped': f"missing dependency: {error}"}
+    except Exception as error:
+        cases = {'failed': f"{type(error).__name__}: {error}"}
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == 'darwin' else peak_rss / 1024
+    results.put({'cases': cases, 'peak_rss_mb': peak_rss_mb})
+
+def _wait_for_outcome(process, results, timeout, poll_interval=1.0):
+    """Wait for a scenario's result, failing it if the process dies or hangs"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return results.get(timeout=poll_interval)
+        except queue.Empty:
+            pass
+        if not process.is_alive():
+            # The result may still be in flight from a process that just exited
+            try:
+                return results.get(timeout=poll_interval)
+            except queue.Empty:
+                reason = f"process exited with code {process.exitcode} without a result"
+                break
+        if time.monotonic() > deadline:
+            process.terminate()
+            reason = f"timed out after {timeout:.0f} s"
+            break
+    return {'cases': {'failed': reason}, 'peak_rss_mb': None}
+
+def run_benchmarks(names, options, timeout=1800):
+    context = multiprocessing.get_context('spawn')
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'scenarios': {},
+    }
+    for name in names:
+        results = context.Queue()
+        process = context.Process(target=_run_scenario, args=(name, options, results))
+        process.start()
+        # An OOM kill or segfault never puts a result, so never block on get()
+        outcome = _wait_for_outcome(process, results, timeout)
+        process.join()
+        report['scenarios'][name] = outcome
+        peak_rss = outcome['peak_rss_mb']
+        print(f"{name} (peak RSS {'n/a' if peak_rss is None else f'{peak_rss:.1f}'} MB)",
+              file=sys.stderr)
+        for case, stats in outcome['cases'].items():
+            if isinstance(stats, str):
+                print(f"  {case}: {stats}", file=sys.stderr)
+            else:
+                print(f"  {case:16s} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  "
+                      f"p99 {stats['p99_ms']:9.3f} ms  {stats['throughput_per_s']:10.1f}/s",
+                      file=sys.stderr)
+    return report
+
+def compare_reports(baseline, current, threshold):
+    """Return the cases whose p50 regressed by more than `threshold`x
+    
+    A case measured in the baseline that is now missing, failed or skipped
+    counts as a regression too.
+    """
+    regressions = []
+    for name, outcome in current['scenarios'].items():
+        baseline_cases = baseline.get('scenarios', {}).get(name, {}).get('cases', {})
+        cases = outcome['cases']
+        for case, old in baseline_cases.items():
+            if not isinstance(old, dict):
+                continue
+            stats = cases.get(case)
+            if not isinstance(stats, dict):
+                status = next((f"{key}: {cases[key]}" for key in ('failed', 'skipped')
+                               if key in cases), 'missing')
+                regressions.append(f"{name}/{case}: p50 {old['p50_ms']:.3f} ms -> {status}")
+                continue
+            ratio = stats['p50_ms'] / old['p50_ms']
+            if ratio > threshold:
+                regressions.append(f"{name}/{case}: p50 {old['p50_ms']:.3f} -> "
+                                   f"{stats['p50_ms']:.3f} ms ({ratio:.2f}x)")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the repo hot paths')
+    parser.add_argument('scenarios', nargs='*',
+                        help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--model', default=os.path.join(REPO_ROOT, 'Task1_EdgeAI',
+                                                        'recyclable_model.tflite'))
+    parser.add_argument('--train-sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--qubit-counts', type=int, nargs='+', default=[3, 8, 12, 16, 20])
+    parser.add_argument('--output', help='write the JSON report here (default: stdout)')
+    parser.add_argument('--compare', help='baseline JSON report to check for regressions')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='p50 slowdown ratio that counts as a regression')
+    parser.add_argument('--timeout', type=float, default=1800,
+                        help='seconds before a scenario is killed and marked failed')
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    
+    options = {
+        'iterations': args.iterations,
+        'model': args.model,
+        'train_sizes': args.train_sizes,
+        'qubit_counts': args.qubit_counts,
+    }
+    report = run_benchmarks(args.scenarios or list(SCENARIOS), options, args.timeout)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare_reports(json.load(f), report, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)